@@ -1,13 +1,28 @@
 # -*- coding: utf-8 -*-
 """AI client for answer selection using an OpenAI-compatible API."""
 from __future__ import annotations
+import json
 import re
 import time
 import requests
-from typing import List, Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import List, Optional, Dict, Any, Tuple
 from loguru import logger
 from .config_loader import load_ai_config
 
+# Shared keep-alive session: one TCP/TLS handshake for all AI calls in a run.
+# Retries are handled by ai_choose_answer itself, so the adapter never retries.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0))
+
+_LETTER_INDEX = {"A": 0, "B": 1, "C": 2, "D": 3}
+_LETTER_RE = re.compile(r"([ABCD])")
+_NUMBER_RE = re.compile(r"\b([1-4])\b")
+_JSON_ARRAY_RE = re.compile(r"\[.*?\]", re.S)
+# A bare answer list such as "A, C D": nothing but single letters and separators
+_LETTER_LIST_RE = re.compile(r"^[ABCD](?:\s*[,\s]\s*[ABCD])*$")
+
 
 def ai_choose_answer(question: str, options_list: List[str], cfg: Optional[Dict[str, Any]] = None) -> int:
     """Call AI service to choose an answer among A/B/C/D.
@@ -44,6 +59,11 @@ def ai_choose_answer(question: str, options_list: List[str], cfg: Optional[Dict[
         "temperature": cfg.get("temperature", 0.2),
         "max_tokens": 5,
     }
+    # With logit_bias pinned to the A/B/C/D tokens the model can only emit one letter
+    logit_bias = cfg.get("logit_bias")
+    if logit_bias:
+        payload["logit_bias"] = logit_bias
+        payload["max_tokens"] = 1
 
     # Retry policy
     retries_cfg = cfg.get("retries", 3)
@@ -57,11 +77,11 @@ def ai_choose_answer(question: str, options_list: List[str], cfg: Optional[Dict[
 
     for attempt in range(1, total_attempts + 1):
         try:
-            resp = requests.post(endpoint, headers=headers, json=payload, timeout=cfg.get("timeout", 15))
+            resp = _SESSION.post(endpoint, headers=headers, json=payload, timeout=cfg.get("timeout", 15))
             if resp.status_code != 200:
                 logger.warning(f"[AI 第{attempt}/{total_attempts}次] HTTP {resp.status_code}: {resp.text[:200]}")
                 if attempt < total_attempts:
-                    time.sleep(0.5)
+                    time.sleep(0.5 * 2 ** (attempt - 1))
                 continue
             data = resp.json()
             try:
@@ -69,16 +89,17 @@ def ai_choose_answer(question: str, options_list: List[str], cfg: Optional[Dict[
             except Exception:
                 content = str(data)
             text = str(content).strip().upper()
-            idx = -1
-            m = re.search(r"([ABCD])", text)
-            if m:
-                letter = m.group(1)
-                idx = {"A": 0, "B": 1, "C": 2, "D": 3}.get(letter, -1)
+            # Fast path: the common clean reply starts with the letter itself
+            idx = _LETTER_INDEX.get(text[:1], -1)
             if idx == -1:
-                m2 = re.search(r"\b([1-4])\b", text)
+                m = _LETTER_RE.search(text)
+                if m:
+                    idx = _LETTER_INDEX[m.group(1)]
+            if idx == -1 and not logit_bias:
+                m2 = _NUMBER_RE.search(text)
                 if m2:
                     idx = int(m2.group(1)) - 1
-            if idx == -1:
+            if idx == -1 and not logit_bias:
                 for i, opt in enumerate(options_list):
                     if str(opt).strip() and str(opt).strip() in text:
                         idx = i
@@ -89,9 +110,101 @@ def ai_choose_answer(question: str, options_list: List[str], cfg: Optional[Dict[
             else:
                 logger.warning(f"[AI 第{attempt}/{total_attempts}次] 返回无法解析: {text}")
                 if attempt < total_attempts:
-                    time.sleep(0.5)
+                    time.sleep(0.5 * 2 ** (attempt - 1))
         except Exception as e:
             logger.warning(f"[AI 第{attempt}/{total_attempts}次] 请求异常：{e}")
             if attempt < total_attempts:
-                time.sleep(0.5)
+                time.sleep(0.5 * 2 ** (attempt - 1))
     return -1
+
+
+def ai_choose_answers_batch(items: List[Tuple[str, List[str]]], cfg: Optional[Dict[str, Any]] = None) -> List[int]:
+    """Ask the AI service to answer several questions in a single request.
+
+    The model is asked to reply with a JSON array of letters, one per question.
+    Returns a list aligned with items: 0-3 for index, or -1 where the reply could not be parsed.
+    """
+    if not items:
+        return []
+    if cfg is None:
+        cfg = load_ai_config()
+    if not cfg.get("enabled"):
+        return [-1] * len(items)
+
+    base_url = cfg.get("base_url", "").rstrip("/")
+    endpoint = f"{base_url}/chat/completions"
+    headers = {"Content-Type": "application/json"}
+    if cfg.get("token"):
+        headers["Authorization"] = f"Bearer {cfg['token']}"
+
+    blocks = []
+    for n, (question, options_list) in enumerate(items, start=1):
+        blocks.append(
+            f"{n}. 题目：{question}\n"
+            f"A. {options_list[0]}\n"
+            f"B. {options_list[1]}\n"
+            f"C. {options_list[2]}\n"
+            f"D. {options_list[3]}"
+        )
+    user_content = (
+        f"下面共有 {len(items)} 道题，请为每道题选择最合适的选项。\n\n"
+        + "\n\n".join(blocks)
+        + f"\n\n注意：只输出一个 JSON 数组，按题号顺序包含 {len(items)} 个字母（A/B/C/D），"
+          f"例如 [\"A\", \"C\"]，不要输出其他任何内容。"
+    )
+    payload = {
+        "model": cfg.get("model"),
+        "messages": [
+            {"role": "system", "content": "你是英语单词选择题助手。根据题干与四个选项选择正确答案。"},
+            {"role": "user", "content": user_content},
+        ],
+        "temperature": cfg.get("temperature", 0.2),
+        "max_tokens": 8 * len(items) + 16,
+    }
+
+    # Retry policy
+    retries_cfg = cfg.get("retries", 3)
+    try:
+        retries = int(retries_cfg)
+    except Exception:
+        retries = 3
+    if retries < 0:
+        retries = 0
+    total_attempts = 1 + retries
+
+    for attempt in range(1, total_attempts + 1):
+        try:
+            resp = _SESSION.post(endpoint, headers=headers, json=payload, timeout=cfg.get("timeout", 15))
+            if resp.status_code != 200:
+                logger.warning(f"[AI 批量 第{attempt}/{total_attempts}次] HTTP {resp.status_code}: {resp.text[:200]}")
+                if attempt < total_attempts:
+                    time.sleep(0.5 * 2 ** (attempt - 1))
+                continue
+            data = resp.json()
+            try:
+                content = data["choices"][0]["message"]["content"]
+            except Exception:
+                content = str(data)
+            text = str(content).strip().upper()
+            letters: List[Any] = []
+            m = _JSON_ARRAY_RE.search(text)
+            if m:
+                try:
+                    letters = json.loads(m.group(0))
+                except ValueError:
+                    letters = []
+            if len(letters) != len(items) and _LETTER_LIST_RE.match(text):
+                # Never pick letters out of prose: they would be misaligned answers
+                letters = _LETTER_RE.findall(text)
+            if len(letters) == len(items):
+                result = [_LETTER_INDEX.get(str(x).strip(), -1) for x in letters]
+                logger.info(f"AI批量判定 {len(items)} 题: {''.join(chr(i + 65) if i != -1 else '?' for i in result)}（第{attempt}次）")
+                return result
+            logger.warning(f"[AI 批量 第{attempt}/{total_attempts}次] 返回无法解析: {text[:200]}")
+            if attempt < total_attempts:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+        except Exception as e:
+            logger.warning(f"[AI 批量 第{attempt}/{total_attempts}次] 请求异常：{e}")
+            if attempt < total_attempts:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+    return [-1] * len(items)
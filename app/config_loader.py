@@ -1,11 +1,89 @@
 # -*- coding: utf-8 -*-
 """Configuration loading utilities for users, AI options, and ChromeDriver path."""
 from __future__ import annotations
+import functools
 import os
 import yaml
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 from loguru import logger
 
+try:
+    from yaml import CSafeLoader as _SafeLoader  # libyaml C extension
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_config(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a YAML config file; cached per (path, mtime) so all loaders share one parse."""
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_SafeLoader) or {}
+
+
+def _read_config(path: str) -> Dict[str, Any]:
+    """Return the parsed config, re-reading the file only when its mtime changes."""
+    return _parse_config(path, os.path.getmtime(path))
+
+
+def _parse_users(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Parse and validate the users list from a loaded config.yaml dict.
+
+    Returns a list of dicts with keys: idx, username, password, addition,
+    answer_time_seconds, expected_score, mode. Entries without username/password are skipped.
+    """
+    users = cfg.get("users")
+    valid_users: List[Dict[str, Any]] = []
+    if not isinstance(users, list):
+        return valid_users
+    for idx, u in enumerate(users, start=1):
+        if not isinstance(u, dict):
+            continue
+        uname = str(u.get("username", "")).strip()
+        pwd = str(u.get("password", "")).strip()
+        addition = str(u.get("addition", "")).strip()
+        # Read answer_time_seconds with default 300 (5 minutes)
+        answer_time = u.get("answer_time_seconds", 300)
+        try:
+            answer_time = int(answer_time)
+            if answer_time <= 0:
+                answer_time = 300
+        except (ValueError, TypeError):
+            answer_time = 300
+        # Read expected_score with default 100 (all correct)
+        expected_score = u.get("expected_score", 100)
+        try:
+            expected_score = int(expected_score)
+            if expected_score < 0:
+                expected_score = 0
+            elif expected_score > 100:
+                expected_score = 100
+        except (ValueError, TypeError):
+            expected_score = 100
+        # Read mode with default "browser"
+        mode = str(u.get("mode", "browser")).strip().lower()
+        if mode not in ["browser", "api"]:
+            mode = "browser"
+        if uname and pwd:
+            valid_users.append({"idx": idx, "username": uname, "password": pwd, "addition": addition, "answer_time_seconds": answer_time, "expected_score": expected_score, "mode": mode})
+    return valid_users
+
+
+def load_all_user_credentials() -> List[Dict[str, Any]]:
+    """Load every valid user from config.yaml without prompting (used for parallel runs).
+
+    Returns an empty list if config.yaml is missing or has no valid users.
+    """
+    cfg_path = "config.yaml"
+    if not os.path.exists(cfg_path):
+        logger.debug("未找到 config.yaml，跳过配置读取。")
+        return []
+    try:
+        cfg = _read_config(cfg_path)
+        return _parse_users(cfg)
+    except Exception as e:
+        logger.error(f"读取 config.yaml 失败：{e}")
+        return []
+
 
 def load_user_credentials() -> Tuple[Optional[str], Optional[str], int, int, str]:
     """Load username/password/answer_time_seconds/expected_score/mode from config.yaml (multi-user supported).
@@ -20,65 +98,32 @@ def load_user_credentials() -> Tuple[Optional[str], Optional[str], int, int, str
         logger.debug("未找到 config.yaml，跳过配置读取。")
         return None, None, 300, 100, "browser"
     try:
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
-
-        users = cfg.get("users")
-        if isinstance(users, list) and users:
-            valid_users = []
-            for idx, u in enumerate(users, start=1):
-                if not isinstance(u, dict):
-                    continue
-                uname = str(u.get("username", "")).strip()
-                pwd = str(u.get("password", "")).strip()
-                addition = str(u.get("addition", "")).strip()
-                # Read answer_time_seconds with default 300 (5 minutes)
-                answer_time = u.get("answer_time_seconds", 300)
-                try:
-                    answer_time = int(answer_time)
-                    if answer_time <= 0:
-                        answer_time = 300
-                except (ValueError, TypeError):
-                    answer_time = 300
-                # Read expected_score with default 100 (all correct)
-                expected_score = u.get("expected_score", 100)
-                try:
-                    expected_score = int(expected_score)
-                    if expected_score < 0:
-                        expected_score = 0
-                    elif expected_score > 100:
-                        expected_score = 100
-                except (ValueError, TypeError):
-                    expected_score = 100
-                # Read mode with default "browser"
-                mode = str(u.get("mode", "browser")).strip().lower()
-                if mode not in ["browser", "api"]:
-                    mode = "browser"
-                if uname and pwd:
-                    valid_users.append({"idx": idx, "username": uname, "password": pwd, "addition": addition, "answer_time_seconds": answer_time, "expected_score": expected_score, "mode": mode})
-            if valid_users:
-                if len(valid_users) == 1:
-                    u = valid_users[0]
+        cfg = _read_config(cfg_path)
+
+        valid_users = _parse_users(cfg)
+        if valid_users:
+            if len(valid_users) == 1:
+                u = valid_users[0]
+                add = f" ({u['addition']})" if u['addition'] else ""
+                logger.info(f"使用 config.yaml 中的账号: {u['username']}{add}")
+                logger.info(f"模式: {u['mode']}")
+                return u["username"], u["password"], u["answer_time_seconds"], u["expected_score"], u["mode"]
+            else:
+                logger.info("检测到 config.yaml 中存在多个账号：")
+                for u in valid_users:
                     add = f" ({u['addition']})" if u['addition'] else ""
-                    logger.info(f"使用 config.yaml 中的账号: {u['username']}{add}")
-                    logger.info(f"模式: {u['mode']}")
-                    return u["username"], u["password"], u["answer_time_seconds"], u["expected_score"], u["mode"]
-                else:
-                    logger.info("检测到 config.yaml 中存在多个账号：")
+                    logger.info(f"{u['idx']}: {u['username']}{add}")
+                choice = input("请输入你想登录的账号（输入前面的序号）: ").strip()
+                try:
+                    choice_idx = int(choice)
                     for u in valid_users:
-                        add = f" ({u['addition']})" if u['addition'] else ""
-                        logger.info(f"{u['idx']}: {u['username']}{add}")
-                    choice = input("请输入你想登录的账号（输入前面的序号）: ").strip()
-                    try:
-                        choice_idx = int(choice)
-                        for u in valid_users:
-                            if u["idx"] == choice_idx:
-                                logger.info(f"模式: {u['mode']}")
-                                return u["username"], u["password"], u["answer_time_seconds"], u["expected_score"], u["mode"]
-                        logger.error("选择的序号不存在。")
-                    except Exception:
-                        logger.error("输入无效，未能选择账号。")
-                    return None, None, 300, 100, "browser"
+                        if u["idx"] == choice_idx:
+                            logger.info(f"模式: {u['mode']}")
+                            return u["username"], u["password"], u["answer_time_seconds"], u["expected_score"], u["mode"]
+                    logger.error("选择的序号不存在。")
+                except Exception:
+                    logger.error("输入无效，未能选择账号。")
+                return None, None, 300, 100, "browser"
 
         logger.debug("config.yaml 未提供有效的 users 列表，将回退到命令行输入。")
         return None, None, 300, 100, "browser"
@@ -90,15 +135,14 @@ def load_user_credentials() -> Tuple[Optional[str], Optional[str], int, int, str
 def load_ai_config() -> Dict[str, Any]:
     """Load AI answer configuration from config.yaml.
 
-    Returns dict with keys: enabled, base_url, token, model, temperature, timeout, retries.
+    Returns dict with keys: enabled, base_url, token, model, temperature, timeout, retries, logit_bias.
     """
     cfg_path = "config.yaml"
     result: Dict[str, Any] = {"enabled": False}
     try:
         if not os.path.exists(cfg_path):
             return result
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
+        cfg = _read_config(cfg_path)
         ai = cfg.get("ai") or {}
         if not isinstance(ai, dict):
             ai = {}
@@ -112,6 +156,16 @@ def load_ai_config() -> Dict[str, Any]:
         temperature = ai.get("temperature", 0.2)
         timeout = ai.get("timeout", 15)
         retries = ai.get("retries", 3)
+        # Optional token-id -> bias map restricting output to the A/B/C/D tokens of the configured model
+        logit_bias = ai.get("logit_bias")
+        if isinstance(logit_bias, dict) and logit_bias:
+            try:
+                logit_bias = {str(int(k)): int(v) for k, v in logit_bias.items()}
+            except (ValueError, TypeError):
+                logger.warning("ai.logit_bias 格式无效（应为 token_id: 偏置值），已忽略。")
+                logit_bias = None
+        else:
+            logit_bias = None
         result.update({
             "enabled": enabled,
             "base_url": base_url,
@@ -120,6 +174,7 @@ def load_ai_config() -> Dict[str, Any]:
             "temperature": float(temperature) if isinstance(temperature, (int, float, str)) else 0.2,
             "timeout": int(timeout) if isinstance(timeout, (int, float, str)) else 15,
             "retries": int(retries) if isinstance(retries, (int, float, str)) else 3,
+            "logit_bias": logit_bias,
         })
         try:
             if result["retries"] < 0:
@@ -147,8 +202,7 @@ def load_chrome_driver_path() -> Optional[str]:
         cfg_path = "config.yaml"
         if not os.path.exists(cfg_path):
             return None
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
+        cfg = _read_config(cfg_path)
         raw = cfg.get("chrome_driver_path")
         if not raw:
             return None
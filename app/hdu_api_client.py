@@ -2,24 +2,113 @@
 """HDU API client for API-based answering mode."""
 from __future__ import annotations
 import base64
+import functools
 import json
 import random
 import re
 import secrets
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from urllib.parse import urlparse
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from loguru import logger
 
+try:
+    import orjson  # optional: faster (de)serialization of paper payloads
+except ImportError:
+    orjson = None
+
+try:
+    import httpx  # optional: HTTP/2 multiplexing for skl.hdu.edu.cn API calls
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when h2 is installed, i.e. httpx[http2])
+except ImportError:
+    httpx = None
+
 from .utils import generate_skl_ticket
 from .question_processor import QuestionProcessor
 
+# Login page token extractors, compiled once at import
+_CRYPTO_RE = re.compile(r'<p[^>]*id="login-croypto"[^>]*>([^<]+)</p>')
+_EXECUTION_RE = re.compile(r'<p[^>]*id="login-page-flowkey"[^>]*>([^<]+)</p>')
+
+
+def _json_loads(content: bytes):
+    """Decode a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps(obj) -> bytes:
+    """Encode a JSON request body as UTF-8 bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+# Option letters by index, for turning answer indices into the letters the API expects
+_LETTERS = "ABCD"
+
+
+def _clean_field(value: str) -> str:
+    """Trim surrounding whitespace and trailing periods from a paper title/option."""
+    return value.strip().rstrip('.').rstrip()
+
+
+# Paper endpoints (/paper/new, /paper/save) are not safe to retry automatically
+_PAPER_API_PREFIX = "https://skl.hdu.edu.cn/api/paper/"
+
+
+def _build_session() -> requests.Session:
+    """Create a Session with pooled keep-alive connections and retries on transient GET failures.
+
+    POSTs (login form, paper submission) are never retried automatically, and neither are
+    GETs under /api/paper/: /api/paper/new creates a paper server-side and is rate-limited.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Longest mount prefix wins: a retried 5xx/timeout here could create a duplicate paper
+    # or trip the rate limit, and a retried 429 would hide the limit from the caller
+    session.mount(_PAPER_API_PREFIX, HTTPAdapter(max_retries=0))
+    return session
+
+
+def _build_api_session(timeout: int):
+    """Create the HTTP client for skl.hdu.edu.cn API calls.
+
+    With httpx[http2] installed this is an HTTP/2 httpx.Client, so all API calls share one
+    multiplexed connection with compressed headers; otherwise a pooled requests Session.
+    """
+    if httpx is None:
+        return _build_session()
+    # retries= only covers connection failures; API calls have no status-based retry here
+    transport = httpx.HTTPTransport(http2=True, retries=3)
+    return httpx.Client(transport=transport, timeout=timeout)
+
 
 class AESECBEncryptor:
     """AES ECB mode encryptor for password encryption."""
-    
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _cipher_for(key_b64: str):
+        """Build (and cache) the ECB cipher for a key; ECB keeps no state between calls, so reuse is safe."""
+        return AES.new(base64.b64decode(key_b64), AES.MODE_ECB)
+
     @staticmethod
     def encrypt(key_b64: str, plaintext: str) -> str:
         """Encrypt plaintext using AES ECB mode with PKCS7 padding.
@@ -31,8 +120,7 @@ class AESECBEncryptor:
         Returns:
             Base64-encoded ciphertext
         """
-        key = base64.b64decode(key_b64)
-        cipher = AES.new(key, AES.MODE_ECB)
+        cipher = AESECBEncryptor._cipher_for(key_b64)
         padded_data = pad(plaintext.encode('utf-8'), AES.block_size)
         ciphertext = cipher.encrypt(padded_data)
         return base64.b64encode(ciphertext).decode('utf-8')
@@ -44,8 +132,11 @@ class HDUAuthService:
     LOGIN_URL = "https://sso.hdu.edu.cn/login"
     BASE_SERVICE_URL = "https://skl.hdu.edu.cn/api/cas/login"
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or _build_session()
+        # CAS tickets are single-use: a retried ticket exchange would resend a consumed ticket
+        # and turn a transient error into a login failure (longest mount prefix wins)
+        self.session.mount(self.BASE_SERVICE_URL, HTTPAdapter(max_retries=0))
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36'
         })
@@ -63,7 +154,7 @@ class HDUAuthService:
         try:
             # Generate state token
             state_token = secrets.token_hex(12)
-            logger.debug(f"Generated state token: {state_token}")
+            logger.debug("Generated state token: {}", state_token)
             
             service_url = f"{self.BASE_SERVICE_URL}?state={state_token}&index="
             
@@ -73,7 +164,7 @@ class HDUAuthService:
                 logger.error("Failed to fetch login tokens")
                 return None
             
-            logger.debug(f"AES Key: {crypto_key}, Execution: {execution[:20]}...")
+            logger.debug("AES Key: {}, Execution: {}...", crypto_key, execution[:20])
             
             # Step 2: Encrypt password
             encrypted_password = AESECBEncryptor.encrypt(crypto_key, password)
@@ -104,13 +195,25 @@ class HDUAuthService:
         """Fetch crypto key and execution token from login page."""
         try:
             params = {'service': service_url}
-            resp = self.session.get(self.LOGIN_URL, params=params, allow_redirects=True)
-            
-            # Extract crypto key
-            crypto_match = re.search(r'<p[^>]*id="login-croypto"[^>]*>([^<]+)</p>', resp.text)
-            # Extract execution token
-            execution_match = re.search(r'<p[^>]*id="login-page-flowkey"[^>]*>([^<]+)</p>', resp.text)
-            
+            resp = self.session.get(self.LOGIN_URL, params=params, allow_redirects=True, stream=True)
+
+            # Stream the page and stop reading as soon as both tokens have been seen
+            crypto_match = execution_match = None
+            html = ""
+            try:
+                if resp.encoding is None:
+                    resp.encoding = 'utf-8'
+                for chunk in resp.iter_content(chunk_size=8192, decode_unicode=True):
+                    html += chunk
+                    # Extract crypto key
+                    crypto_match = crypto_match or _CRYPTO_RE.search(html)
+                    # Extract execution token
+                    execution_match = execution_match or _EXECUTION_RE.search(html)
+                    if crypto_match and execution_match:
+                        break
+            finally:
+                resp.close()
+
             if crypto_match and execution_match:
                 return crypto_match.group(1), execution_match.group(1), resp.url
             else:
@@ -156,43 +259,40 @@ class HDUAuthService:
             logger.error(f"Failed to post login form: {e}")
             return None
     
+    @staticmethod
+    def _token_from_location(location: str) -> Optional[str]:
+        """Extract the token from a redirect Location's URL fragment, if present."""
+        fragment = urlparse(location).fragment
+        if 'token=' not in fragment:
+            return None
+        # Split the fragment's query string by hand (hash routes may carry it after a '?'):
+        # parse_qs would turn a literal '+' in the token into a space
+        for param in fragment.rpartition('?')[2].split('&'):
+            key, _, value = param.partition('=')
+            if key == 'token':
+                return value or None
+        return None
+
     def _exchange_ticket_for_token(self, ticket_url: str, referer: str) -> Optional[str]:
-        """Exchange ticket for X-Auth-Token by following redirects."""
+        """Exchange ticket for X-Auth-Token by following redirects.
+
+        requests follows the CAS -> service redirect chain itself; the token is then
+        read from the Location headers recorded in resp.history, or from the cookies.
+        """
         try:
-            current_url = ticket_url
-            max_redirects = 10
-            
-            for i in range(max_redirects):
-                resp = self.session.get(current_url, headers={'Referer': referer}, allow_redirects=False)
-                
-                if resp.status_code == 302:
-                    location = resp.headers.get('Location', '')
-                    
-                    # Check if token is in URL fragment
-                    if 'token=' in location:
-                        # Extract token from fragment
-                        if '#' in location:
-                            fragment = location.split('#')[1]
-                            if 'token=' in fragment:
-                                # Parse fragment as query string
-                                fragment = fragment.lstrip('?')
-                                params = dict(param.split('=') for param in fragment.split('&') if '=' in param)
-                                token = params.get('token')
-                                if token:
-                                    logger.debug("Found token in URL fragment")
-                                    return token
-                    
-                    referer = current_url
-                    current_url = location
-                    continue
-                
-                # Check cookies for X-Auth-Token
-                if 'X-Auth-Token' in self.session.cookies:
-                    logger.debug("Found token in cookies")
-                    return self.session.cookies['X-Auth-Token']
-                
-                break
-            
+            resp = self.session.get(ticket_url, headers={'Referer': referer}, allow_redirects=True)
+
+            for hop in resp.history:
+                token = self._token_from_location(hop.headers.get('Location', ''))
+                if token:
+                    logger.debug("Found token in URL fragment")
+                    return token
+
+            # Check cookies for X-Auth-Token
+            if 'X-Auth-Token' in self.session.cookies:
+                logger.debug("Found token in cookies")
+                return self.session.cookies['X-Auth-Token']
+
             logger.error("Failed to find X-Auth-Token after all redirects")
             return None
             
@@ -206,40 +306,41 @@ class HDUApiClient:
     
     BASE_URL = "https://skl.hdu.edu.cn/api"
     
-    def __init__(self, x_auth_token: str, timeout: int = 30):
+    def __init__(self, x_auth_token: str, timeout: int = 30, session=None):
         self.x_auth_token = x_auth_token
         self.timeout = timeout
-        self.session = requests.Session()
-    
-    def _get_common_headers(self, skl_ticket: str) -> Dict[str, str]:
-        """Get common headers for API requests."""
-        return {
+        self.session = session or _build_api_session(timeout)
+        # Built once; the session may be shared with the SSO login, so these are not
+        # installed as session-wide defaults
+        self._base_headers = {
             'Accept': 'application/json, text/plain, */*',
             'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
             'Connection': 'keep-alive',
             'Referer': 'https://skl.hdu.edu.cn/',
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36',
             'X-Auth-Token': self.x_auth_token,
-            'skl-ticket': skl_ticket
         }
     
+    def _get_common_headers(self, skl_ticket: str, **extra: str) -> Dict[str, str]:
+        """Get common headers for API requests, plus any per-request extras."""
+        return {**self._base_headers, 'skl-ticket': skl_ticket, **extra}
+    
     def fetch_current_week(self) -> Optional[int]:
         """Fetch current week number."""
         try:
             skl_ticket = generate_skl_ticket()
-            today = time.strftime("%Y-%m-%d")
-            url = f"{self.BASE_URL}/course?startTime={today}"
+            url = f"{self.BASE_URL}/course"
+            params = {'startTime': time.strftime("%Y-%m-%d")}
             
-            headers = self._get_common_headers(skl_ticket)
-            headers.update({
+            headers = self._get_common_headers(skl_ticket, **{
                 'Cache-Control': 'no-cache',
                 'Pragma': 'no-cache'
             })
             
-            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            resp = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
             
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 week = data.get('week', 0)
                 if week > 0:
                     logger.info(f"Current week: {week}")
@@ -264,21 +365,22 @@ class HDUApiClient:
         """
         try:
             skl_ticket = generate_skl_ticket()
-            start_time = int(time.time() * 1000)
-            url = f"{self.BASE_URL}/paper/new?type={exam_type}&week={week}&startTime={start_time}"
+            start_time = time.time_ns() // 1_000_000
+            url = f"{self.BASE_URL}/paper/new"
+            params = {'type': exam_type, 'week': week, 'startTime': start_time}
             
             headers = self._get_common_headers(skl_ticket)
             
-            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            resp = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
             
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 paper_id = data.get('paperId')
                 questions = data.get('list', [])
                 logger.info(f"Got new paper: {paper_id} with {len(questions)} questions")
                 return data
             elif resp.status_code == 400:
-                error_data = resp.json()
+                error_data = _json_loads(resp.content)
                 if error_data.get('code') == 2 and '请勿在短时间重试' in error_data.get('msg', ''):
                     logger.warning("Rate limited: Please don't retry in a short time")
                     return None
@@ -310,13 +412,16 @@ class HDUApiClient:
                 'list': answers
             }
             
-            headers = self._get_common_headers(skl_ticket)
-            headers.update({
+            headers = self._get_common_headers(skl_ticket, **{
                 'Content-Type': 'application/json',
                 'Origin': 'https://skl.hdu.edu.cn'
             })
             
-            resp = self.session.post(url, json=payload, headers=headers, timeout=self.timeout)
+            body = _json_dumps(payload)
+            if httpx is not None and isinstance(self.session, httpx.Client):
+                resp = self.session.post(url, content=body, headers=headers, timeout=self.timeout)
+            else:
+                resp = self.session.post(url, data=body, headers=headers, timeout=self.timeout)
             
             if resp.status_code == 200:
                 logger.success("Paper submitted successfully")
@@ -375,56 +480,66 @@ def extract_token_from_browser(driver) -> Optional[str]:
         return None
 
 
-def api_mode_answer(username: str, password: str, expected_score: int, 
-                   answer_time: int, question_processor: QuestionProcessor, exam_type: Optional[str] = None) -> bool:
+def prompt_exam_type() -> str:
+    """Prompt the user to choose between self-test ("0") and exam ("1") mode."""
+    logger.info("=" * 50)
+    logger.info("请选择模式:")
+    logger.info("0 - 自测模式 (Self-test)")
+    logger.info("1 - 考试模式 (Exam)")
+    logger.info("=" * 50)
+
+    while True:
+        choice = input("请输入 0 或 1: ").strip()
+        if choice in ['0', '1']:
+            mode_name = "自测模式" if choice == '0' else "考试模式"
+            logger.info(f"已选择: {mode_name}")
+            return choice
+        logger.warning("无效输入，请输入 0 或 1")
+
+
+def api_mode_answer(username: str, password: Optional[str], expected_score: int,
+                   answer_time: int, question_processor: QuestionProcessor, exam_type: Literal['0', '1'],
+                   x_auth_token: Optional[str] = None) -> bool:
     """Execute answering in API mode.
+
+    Never blocks on user input; callers decide exam_type up front (see prompt_exam_type),
+    so answer_time is measured from the actual start of the run.
     
     Args:
         username: HDU username
-        password: HDU password
+        password: HDU password (unused when x_auth_token is given)
         expected_score: Expected score (0-100)
         answer_time: Time to wait before submission (seconds)
         question_processor: Instance of QuestionProcessor for answer logic
-        exam_type: Exam type - "0" for exam, "1" for self-test (None to prompt)
+        exam_type: Exam type - "0" for self-test, "1" for exam
+        x_auth_token: Token from an already authenticated session (e.g. a browser login);
+            skips the password login when given
 
     Returns:
         True if successful, False otherwise
     """
     start_time = time.time()
-    
-    # Prompt user for exam type if not provided
-    if exam_type is None:
-        logger.info("=" * 50)
-        logger.info("请选择模式:")
-        logger.info("0 - 自测模式 (Self-test)")
-        logger.info("1 - 考试模式 (Exam)")
-        logger.info("=" * 50)
-
-        while True:
-            choice = input("请输入 0 或 1: ").strip()
-            if choice in ['0', '1']:
-                exam_type = choice
-                mode_name = "自测模式" if choice == '0' else "考试模式"
-                logger.info(f"已选择: {mode_name}")
-                break
-            else:
-                logger.warning("无效输入，请输入 0 或 1")
 
-    # 1. Login and get token
-    auth_service = HDUAuthService()
-    x_auth_token = auth_service.login(username, password)
-    if not x_auth_token:
-        logger.error("API 登录失败，无法获取 Token")
-        return False
-
-    api_client = HDUApiClient(x_auth_token)
+    # 1. Login and get token (without httpx[http2], one session for login and API calls
+    #    keeps the skl.hdu.edu.cn connection alive)
+    if x_auth_token:
+        api_client = HDUApiClient(x_auth_token)
+    else:
+        session = _build_session()
+        auth_service = HDUAuthService(session=session)
+        x_auth_token = auth_service.login(username, password)
+        if not x_auth_token:
+            logger.error("API 登录失败，无法获取 Token")
+            return False
+        api_client = HDUApiClient(x_auth_token, session=None if httpx is not None else session)
 
     # 2. Get current week
     week = api_client.fetch_current_week()
     if not week:
         return False
 
-    # 3. Get new paper
+    # 3. Get new paper (every answer persisted in this process already updates the
+    #    in-memory bank, so no reload from disk is needed)
     paper_data = api_client.get_new_paper(week, exam_type=exam_type)
     if not paper_data:
         return False
@@ -448,50 +563,47 @@ def api_mode_answer(username: str, password: str, expected_score: int,
     elif wrong_count > len(questions):
         wrong_count = len(questions)
 
-    # Randomly select indices of questions to answer incorrectly
-    wrong_indices = set()
+    # Randomly mark questions to answer incorrectly (a per-index flag list, no set hashing)
+    wrong_mask = [True] * wrong_count + [False] * (len(questions) - wrong_count)
+    random.shuffle(wrong_mask)
     if wrong_count > 0:
-        wrong_indices = set(random.sample(range(len(questions)), wrong_count))
         logger.info(f"期望分数: {expected_score} 分，将随机做错 {wrong_count} 题")
 
-    # Reload question bank to ensure it's up-to-date
-    question_processor.reload_question_bank()
-
-    for idx, q_data in enumerate(questions):
-        paper_detail_id = q_data.get('paperDetailId')
-        title = q_data.get('title', '').strip().rstrip('.').rstrip()
+    items = []
+    for q_data in questions:
+        get = q_data.get
+        title = _clean_field(get('title', ''))
 
         options = [
-            q_data.get('answerA', '').strip().rstrip('.'),
-            q_data.get('answerB', '').strip().rstrip('.'),
-            q_data.get('answerC', '').strip().rstrip('.'),
-            q_data.get('answerD', '').strip().rstrip('.')
+            _clean_field(get('answerA', '')),
+            _clean_field(get('answerB', '')),
+            _clean_field(get('answerC', '')),
+            _clean_field(get('answerD', ''))
         ]
+        items.append((title, options))
 
-        logger.info(title)
-        logger.debug(f"A: {options[0]}")
-        logger.debug(f"B: {options[1]}")
-        logger.debug(f"C: {options[2]}")
-        logger.debug(f"D: {options[3]}")
+    # Use QuestionProcessor to resolve the whole paper (bank first, AI misses batched)
+    answer_indices = question_processor.get_answer_indices(items)
 
+    for idx, (q_data, (title, options), correct_answer_idx) in enumerate(zip(questions, items, answer_indices)):
+        paper_detail_id = q_data.get('paperDetailId')
 
-        # Use QuestionProcessor to get the answer index
-        correct_answer_idx = question_processor.get_answer_index(title, options)
+        logger.info(title)
+        logger.debug("A: {}\nB: {}\nC: {}\nD: {}", *options)
 
-        correct_answer_char = 'A' # Default to 'A' if no answer found
         if correct_answer_idx != -1:
-            correct_answer_char = chr(correct_answer_idx + 65)
-            logger.info(f"找到答案: {correct_answer_char}")
+            logger.info("找到答案: {}", _LETTERS[correct_answer_idx])
         else:
+            correct_answer_idx = 0  # Default to 'A' if no answer found
             logger.warning(f"题目 '{title}' 未找到答案，默认选择 A")
+        correct_answer_char = _LETTERS[correct_answer_idx]
 
         # Determine final answer (intentionally wrong if needed)
         final_answer_char = correct_answer_char
-        if idx in wrong_indices:
-            wrong_options = [chr(i + 65) for i in range(4) if chr(i + 65) != correct_answer_char]
-            if wrong_options:
-                final_answer_char = random.choice(wrong_options)
-                logger.info(f"故意做错第 {idx + 1} 题，选择 {final_answer_char} 而不是 {correct_answer_char}")
+        if wrong_mask[idx]:
+            # Shift by 1-3 positions: always lands on a different option, no filtering needed
+            final_answer_char = _LETTERS[(correct_answer_idx + random.randint(1, 3)) % 4]
+            logger.info("故意做错第 {} 题，选择 {} 而不是 {}", idx + 1, final_answer_char, correct_answer_char)
 
         final_answers.append({
             "paperDetailId": paper_detail_id,
@@ -508,3 +620,51 @@ def api_mode_answer(username: str, password: str, expected_score: int,
     # 6. Submit paper
     logger.info("提交答案...")
     return api_client.submit_paper(paper_id, final_answers)
+
+
+def api_mode_answer_parallel(users: List[Dict[str, Any]], question_processor: QuestionProcessor,
+                             exam_type: Optional[str] = None, max_workers: Optional[int] = None) -> Dict[str, bool]:
+    """Run API-mode answering for several accounts concurrently.
+
+    Each account gets its own HTTP session, so their network waits and answer-time
+    delays overlap instead of running back to back. The exam type is asked once up front.
+
+    Args:
+        users: User dicts as returned by config_loader.load_all_user_credentials
+        question_processor: Shared QuestionProcessor instance
+        exam_type: Exam type - "0" for self-test, "1" for exam (None to prompt once)
+        max_workers: Maximum concurrent accounts (defaults to number of users)
+
+    Returns:
+        Mapping of username to success flag
+    """
+    if not users:
+        logger.error("config.yaml 中没有可用的账号，无法并行答题")
+        return {}
+    if exam_type is None:
+        exam_type = prompt_exam_type()
+
+    def _run(user: Dict[str, Any]) -> bool:
+        logger.info(f"[{user['username']}] 开始 API 模式答题")
+        try:
+            return api_mode_answer(
+                user["username"],
+                user["password"],
+                user["expected_score"],
+                user["answer_time_seconds"],
+                question_processor,
+                exam_type,
+            )
+        except Exception as e:
+            logger.error(f"[{user['username']}] 答题异常：{e}")
+            return False
+
+    results: Dict[str, bool] = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(users)) as executor:
+        for user, ok in zip(users, executor.map(_run, users)):
+            results[user["username"]] = ok
+            if ok:
+                logger.success(f"[{user['username']}] API 模式答题完成！")
+            else:
+                logger.error(f"[{user['username']}] API 模式答题失败")
+    return results
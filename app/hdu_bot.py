@@ -7,26 +7,204 @@ import random
 import re
 import time
 import threading
-from typing import Tuple, List
+from functools import cached_property
+from typing import Tuple, List, Optional
 
 from loguru import logger
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.support.wait import WebDriverWait
 
 from .config_loader import load_user_credentials, load_chrome_driver_path, load_ai_config
-from .utils import save_error
+from .utils import save_error, close_error_log
 from .question_processor import QuestionProcessor
 
+# 选项文本清洗（去除空白及其后一个字符），模块加载时编译一次
+_OPT_CLEAN_RE = re.compile(r'\s.')
+
+# 页面地址与元素定位器，模块加载时构造一次，避免在登录和答题循环中反复创建
+_LIST_URL = "https://skl.hdu.edu.cn/#/english/list"
+_SSO_LOGIN_URL = "https://sso.hdu.edu.cn/login"
+_PWD_TAB_LOCATOR = (
+    By.XPATH,
+    "//*[contains(text(),'用户名密码') or contains(text(),'账号密码') or contains(text(),'用户名')]/ancestor-or-self::*[self::a or self::button or self::div]"
+)
+# 常见用户名/密码字段匹配（适配新版 SSO）
+_USER_SELECTORS = (
+    (By.CSS_SELECTOR, "input[name='username']"),
+    (By.CSS_SELECTOR, "input#username"),
+    (By.CSS_SELECTOR, "input[autocomplete='username']"),
+    (By.XPATH, "//input[contains(@placeholder,'用户名') or contains(@placeholder,'账号') or contains(@placeholder,'学工号') or contains(@placeholder,'手机号') or contains(@placeholder,'邮箱')]"),
+    (By.XPATH, "//input[@type='text' or @type='email' or @type='tel']"),
+)
+_PWD_SELECTORS = (
+    (By.CSS_SELECTOR, "input[type='password']"),
+    (By.CSS_SELECTOR, "input[name='password']"),
+    (By.CSS_SELECTOR, "input#password"),
+    (By.CSS_SELECTOR, "input[name='passwordPre']"),
+    (By.XPATH, "//input[contains(@placeholder,'密码') and @type='password']"),
+)
+_SUBMIT_CANDIDATES = (
+    (By.XPATH, "//button[contains(., '登录') or contains(., '登 录')]"),
+    (By.XPATH, "//span[normalize-space(text())='登录' or normalize-space(text())='登 录']/ancestor::*[self::button or self::a][1]"),
+    (By.CSS_SELECTOR, "button[type='submit']"),
+    (By.CSS_SELECTOR, "input[type='submit']"),
+    (By.CSS_SELECTOR, "button.login-btn"),
+    (By.CSS_SELECTOR, "button.el-button--primary"),
+)
+# 登录快速路径使用的 CSS 选择器（XPath 选择器仅在慢路径中使用）
+_USER_CSS = [sel for by, sel in _USER_SELECTORS if by == By.CSS_SELECTOR]
+_PWD_CSS = [sel for by, sel in _PWD_SELECTORS if by == By.CSS_SELECTOR]
+# 一次往返完成账号密码填充并提交登录表单；提交后返回密码框元素（供等待其失效），未找到输入框或提交入口时返回 null
+_FILL_AND_SUBMIT_JS = """
+var visible = function (el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); };
+var pick = function (sels) {
+    for (var i = 0; i < sels.length; i++) {
+        var els = document.querySelectorAll(sels[i]);
+        for (var j = 0; j < els.length; j++) {
+            if (visible(els[j]) && !els[j].disabled) { return els[j]; }
+        }
+    }
+    return null;
+};
+var user = pick(arguments[0]), pwd = pick(arguments[1]);
+if (!user || !pwd) { return null; }
+var fill = function (el, value) {
+    el.focus();
+    el.value = value;
+    ['input', 'change', 'blur'].forEach(function (t) { el.dispatchEvent(new Event(t, {bubbles: true})); });
+};
+fill(user, arguments[2]);
+fill(pwd, arguments[3]);
+var usable = function (b) { return visible(b) && !b.disabled; };
+// 优先点击文字为“登录”的按钮；<button> 默认 type=submit，只在密码框所在表单内按 type 匹配
+var btns = document.querySelectorAll('button, input[type="submit"]');
+for (var k = 0; k < btns.length; k++) {
+    var txt = (btns[k].innerText || btns[k].value || '').trim();
+    if (usable(btns[k]) && (txt.indexOf('登录') !== -1 || txt.indexOf('登 录') !== -1)) {
+        btns[k].click();
+        return pwd;
+    }
+}
+if (!pwd.form) { return null; }
+var subs = pwd.form.querySelectorAll('button, input[type="submit"]');
+for (var m = 0; m < subs.length; m++) {
+    if (usable(subs[m]) && subs[m].type === 'submit') {
+        subs[m].click();
+        return pwd;
+    }
+}
+pwd.form.submit();
+return pwd;
+"""
+# 在页面内按顺序检查全部定位器（CSS 或 XPath），返回第一个可见且可用的元素并滚动到视野中；没有则返回 null
+_FIND_INTERACTABLE_JS = """
+var locators = arguments[0];
+for (var i = 0; i < locators.length; i++) {
+    var by = locators[i][0], sel = locators[i][1], els = [];
+    if (by === 'xpath') {
+        var r = document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var k = 0; k < r.snapshotLength; k++) { els.push(r.snapshotItem(k)); }
+    } else {
+        els = document.querySelectorAll(sel);
+    }
+    for (var j = 0; j < els.length; j++) {
+        var el = els[j];
+        if (!el.disabled && (el.offsetWidth > 0 || el.offsetHeight > 0 || el.getClientRects().length)) {
+            el.scrollIntoView({block: 'center'});
+            return el;
+        }
+    }
+}
+return null;
+"""
+# 在页面内筛选可能含登录表单的 iframe：同源且含账号/密码输入框的在前，无法读取内容的跨域 iframe 在后
+_LOGIN_FRAME_CANDIDATES_JS = """
+var has = function (doc, sels) {
+    for (var i = 0; i < sels.length; i++) { if (doc.querySelector(sels[i])) { return true; } }
+    return false;
+};
+var matched = [], unknown = [];
+var frames = document.querySelectorAll('iframe');
+for (var i = 0; i < frames.length; i++) {
+    var doc = null;
+    try { doc = frames[i].contentDocument; } catch (e) { doc = null; }
+    if (!doc) { unknown.push(frames[i]); }
+    else if (has(doc, arguments[0]) || has(doc, arguments[1])) { matched.push(frames[i]); }
+}
+return matched.concat(unknown);
+"""
+# 与原 XPath //*[@id="app"]/div/div[3]/div/div[5]/div[1]/div[3]/button 等价，交给 querySelector 匹配更快
+_NEXT_BTN_CSS = "#app > div > div:nth-of-type(3) > div > div:nth-of-type(5) > div:nth-of-type(1) > div:nth-of-type(3) > button"
+_OPTION_CLASS = "van-cell__title"
+_PAPER_SUBMIT_CLASS = "van-nav-bar__right"
+_CONFIRM_LOCATOR = (By.CSS_SELECTOR, ".van-dialog__confirm.van-hairline--left")
+_CONFIRM_CLOSED_LOCATOR = (By.CSS_SELECTOR, ".van-dialog__confirm")
+
+# 读取当前题目文本（一次往返），供等待下一题时轮询
+_QUESTION_TEXT_JS = """
+var col = document.querySelector('.van-col--17');
+var spans = col ? col.querySelectorAll('span') : [];
+return spans.length > 1 ? spans[1].innerText : null;
+"""
+
+# 定位并点击“下一题”按钮（一次往返），找不到时返回 false
+_CLICK_NEXT_JS = """
+var btn = document.querySelector(arguments[0]);
+if (!btn) { return false; }
+btn.click();
+return true;
+"""
+
+# 一次往返读取题目与前四个选项（文本及元素），代替多次 find_element(s) + .text
+_FIND_QUESTION_JS = """
+var col = document.querySelector('.van-col--17');
+if (!col) { return null; }
+var spans = col.querySelectorAll('span');
+var opts = Array.prototype.slice.call(document.querySelectorAll('.van-cell__title'), 0, 4);
+if (spans.length < 2 || opts.length < 4) { return null; }
+return {
+    question: spans[1].innerText,
+    texts: opts.map(function (e) { return e.innerText; }),
+    elements: opts
+};
+"""
+
+# 关闭自动化用不到的浏览器功能，减少启动和导航开销
+_CHROME_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-features=TranslateUI",
+]
+
+# 答题只依赖 DOM，屏蔽图片、字体和统计脚本以加快页面加载
+_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics*", "*googletagmanager*", "*hm.baidu.com*",
+]
+
 
 class HDU:
     """自动化答题主类，封装核心操作逻辑"""
 
-    def __init__(self):
-        """初始化配置和资源（浏览器驱动将根据模式按需初始化）"""
+    def __init__(self, device: str = "iPhone 6"):
+        """初始化配置和资源（浏览器驱动将根据模式按需初始化）
+
+        Args:
+            device: Chrome 移动端模拟的设备名（如 "iPhone 6"、"iPad"）
+        """
         # 先加载用户配置获取模式
         username, password, answer_time_seconds, expected_score, mode = load_user_credentials()
         
@@ -35,62 +213,100 @@ class HDU:
         self.password = password
         self.answer_time_seconds = answer_time_seconds
         self.expected_score = expected_score
+        self.device = device
         self.driver = None  # 浏览器驱动（仅在 browser 模式下初始化）
         self._last_user_el = None
         self._last_pwd_el = None
-
-        # 初始化 QuestionProcessor
-        ai_cfg = load_ai_config()
-        self.question_processor = QuestionProcessor(ai_cfg)
+        self._option_elements = []  # find_question 取到的选项元素，供 click_answer 复用
+        self._waits = {}  # 超时秒数 -> 复用的 WebDriverWait（只对 _waits_driver 有效）
+        self._waits_driver = None
 
         # 根据模式初始化浏览器（仅 browser 模式需要）
         if self.mode == "browser":
             logger.info("使用浏览器模拟模式")
-            options = webdriver.ChromeOptions()
-            # 移动端模拟配置
-            options.add_experimental_option('mobileEmulation', {'deviceName': 'iPhone 6'})
-
-            # 浏览器驱动配置：优先使用 config.yaml 中的 chrome_driver_path；否则交给 Selenium Manager 或 PATH
-            driver_path = load_chrome_driver_path()
-            try:
-                if driver_path:
-                    if os.path.exists(driver_path):
-                        service = Service(executable_path=driver_path)
-                        self.driver = webdriver.Chrome(options=options, service=service)
-                    else:
-                        logger.warning(f"配置的 chrome_driver_path 路径不存在：{driver_path}，将尝试使用默认驱动（Selenium Manager 或 PATH）。")
-                        self.driver = webdriver.Chrome(options=options)
-                else:
-                    self.driver = webdriver.Chrome(options=options)
-            except Exception as e:
-                logger.error(f"初始化 Chrome 驱动失败：{e}")
-                raise
+            self._init_browser_driver()
         else:
             logger.info("使用 API 模式")
 
         # 计时器相关状态（仅用于 browser 模式）
-        self.timer_expired = False  # 计时器是否已到期
-        self.answering_completed = False  # 答题是否完成
-        self.timer_lock = threading.Lock()  # 线程锁保护状态
+        # 两个状态均用 Event 表示，读写无需加锁；wait() 直接阻塞于 timer_expired 而不是轮询
+        self.timer_expired = threading.Event()  # 计时器是否已到期
+        self.answering_completed = threading.Event()  # 答题是否完成
         self.wrong_question_indices = set()  # 需要故意答错的题目索引集合
 
+    @cached_property
+    def question_processor(self) -> QuestionProcessor:
+        """首次使用时才加载 AI 配置和题库并创建 QuestionProcessor。"""
+        return QuestionProcessor(load_ai_config())
+
+    def _prewarm_question_processor(self) -> None:
+        """触发 question_processor 的首次创建（供后台线程调用）。"""
+        try:
+            self.question_processor
+        except Exception as e:
+            logger.warning(f"预加载题库失败，将在答题时重试：{e}")
+
+    def _build_chrome_options(self) -> webdriver.ChromeOptions:
+        """构造 Chrome 启动参数：移动端模拟、精简浏览器功能，并禁用图片加载。"""
+        options = webdriver.ChromeOptions()
+        # 移动端模拟配置
+        options.add_experimental_option('mobileEmulation', {'deviceName': self.device})
+        # DOMContentLoaded 即返回；需要完整加载的地方（登录页）另有显式等待
+        options.page_load_strategy = "eager"
+        for arg in _CHROME_ARGS:
+            options.add_argument(arg)
+        # 不加载图片（样式表保留：元素可见性/可点击判断依赖布局）
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return options
+
+    def _block_heavy_resources(self) -> None:
+        """通过 CDP 屏蔽图片、字体和统计脚本请求；不支持 CDP 时忽略。"""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.debug(f"设置资源屏蔽失败，忽略：{e}")
+
+    def _wait_until(self, condition, timeout: float = 5):
+        """显式等待条件成立（100ms 轮询，默认 500ms 会让快速就绪的元素也多等）。
+
+        每种超时只创建一个 WebDriverWait 并复用；WebDriverWait 绑定创建时的驱动，
+        驱动被关闭或重建后缓存随之作废，避免在已退出的会话上轮询。
+        页面切换途中条件里的 execute_script 可能偶发脚本错误或元素失效，这些异常视为“尚未成立”继续轮询。
+        """
+        if self._waits_driver is not self.driver:
+            self._waits = {}
+            self._waits_driver = self.driver
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = self._waits[timeout] = WebDriverWait(
+                self.driver, timeout, poll_frequency=0.1,
+                ignored_exceptions=(JavascriptException, StaleElementReferenceException),
+            )
+        return wait.until(condition)
+
     def _start_timer(self):
         """启动答题计时器（从按下回车开始计时）"""
         def timer_thread():
             logger.info(f"计时器已启动，将在 {self.answer_time_seconds} 秒后自动提交")
-            for remaining in range(self.answer_time_seconds, 0, -1):
-                time.sleep(1)
-                # 每30秒或最后10秒提示一次
-                if remaining % 30 == 0 or remaining <= 10:
-                    logger.info(f"剩余时间: {remaining} 秒")
-            
+            deadline = time.monotonic() + self.answer_time_seconds
+            # 每30秒或最后10秒提示一次：只在提示点醒来，而不是每秒轮询
+            marks = [r for r in range(self.answer_time_seconds - 1, 0, -1) if r % 30 == 0 or r <= 10]
+            for remaining in marks:
+                delay = deadline - remaining - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                logger.info(f"剩余时间: {remaining} 秒")
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
             # 时间到
-            with self.timer_lock:
-                self.timer_expired = True
-                if self.answering_completed:
-                    logger.info("时间到且答题已完成，准备提交...")
-                else:
-                    logger.warning("时间到但答题未完成，将在答题完成后立即提交")
+            self.timer_expired.set()
+            if self.answering_completed.is_set():
+                logger.info("时间到且答题已完成，准备提交...")
+            else:
+                logger.warning("时间到但答题未完成，将在答题完成后立即提交")
         
         timer = threading.Thread(target=timer_thread, daemon=True)
         timer.start()
@@ -114,34 +330,28 @@ class HDU:
     def login_web(self, username: str, password: str) -> None:
         """执行网页登录操作：先打开业务页触发重定向到 SSO，再自动填充登录。"""
         # 先打开业务页面，由其自动跳转到带 service/state 的 SSO 登录页
-        list_url = "https://skl.hdu.edu.cn/#/english/list"
         try:
-            self.driver.get(list_url)
+            self.driver.get(_LIST_URL)
         except Exception:
             pass
         # 等待跳转到 SSO（含 service 参数）；若未跳转则回退到 SSO 登录首页
         try:
-            WebDriverWait(self.driver, 15).until(lambda d: "sso.hdu.edu.cn/login" in d.current_url)
+            self._wait_until(lambda d: "sso.hdu.edu.cn/login" in d.current_url, 15)
         except Exception:
             try:
-                self.driver.get("https://sso.hdu.edu.cn/login")
+                self.driver.get(_SSO_LOGIN_URL)
             except Exception:
                 pass
 
         # 等待页面和脚本初始化完成
         try:
-            WebDriverWait(self.driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
+            self._wait_until(lambda d: d.execute_script("return document.readyState") == "complete", 20)
         except Exception:
             pass
 
         # 尝试切换到“用户名密码”登录方式（有些场景默认是其他方式）
         try:
-            tab = WebDriverWait(self.driver, 5).until(
-                ec.element_to_be_clickable((
-                    By.XPATH,
-                    "//*[contains(text(),'用户名密码') or contains(text(),'账号密码') or contains(text(),'用户名')]/ancestor-or-self::*[self::a or self::button or self::div]"
-                ))
-            )
+            tab = self._wait_until(ec.element_to_be_clickable(_PWD_TAB_LOCATOR))
             try:
                 tab.click()
             except Exception:
@@ -157,67 +367,49 @@ class HDU:
             input("登录完成后，请按回车继续...")
             # 导航到业务页面
             try:
-                self.driver.get("https://skl.hdu.edu.cn/#/english/list")
+                self.driver.get(_LIST_URL)
             except Exception:
                 pass
             return
 
         def _find_interactable(selectors, timeout: int = 15):
             """在当前文档内查找可见可交互的元素，支持多选择器，直到超时。"""
-            end = time.time() + timeout
-            while time.time() < end:
-                for by, sel in selectors:
-                    try:
-                        elements = self.driver.find_elements(by, sel)
-                        for el in elements:
-                            try:
-                                if el.is_displayed() and el.is_enabled() and el.size.get('width', 1) > 0 and el.size.get('height', 1) > 0:
-                                    try:
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", el)
-                                    except Exception:
-                                        pass
-                                    return el
-                            except Exception:
-                                continue
-                    except Exception:
-                        continue
-                time.sleep(0.25)
-            return None
+            # 每次轮询只需一次 execute_script，而不是每个定位器、每个元素各查询一遍
+            locators = [list(locator) for locator in selectors]
+            try:
+                return self._wait_until(lambda d: d.execute_script(_FIND_INTERACTABLE_JS, locators), timeout)
+            except Exception:
+                return None
+
+        def _type_into(el, text: str) -> None:
+            """点击输入框后通过 CDP 一次性插入整段文本，代替逐字符的按键事件。
+
+            Input.insertText 写入的是当前获得焦点的元素：点击被遮挡或焦点未切换时会写错输入框，
+            因此插入后核对该框的值，不一致时回退到 clear()+send_keys。
+            """
+            try:
+                el.clear()
+            except Exception:
+                pass
+            try:
+                el.click()
+                self.driver.execute_cdp_cmd("Input.insertText", {"text": text})
+                if el.get_attribute("value") == text:
+                    return
+            except Exception:
+                pass
+            el.clear()
+            el.send_keys(text)
 
         def _fill_inputs_in_current_context() -> bool:
-            # 常见用户名/密码字段匹配（适配新版 SSO）
-            user_selectors = [
-                (By.CSS_SELECTOR, "input[name='username']"),
-                (By.CSS_SELECTOR, "input#username"),
-                (By.CSS_SELECTOR, "input[autocomplete='username']"),
-                (By.XPATH, "//input[contains(@placeholder,'用户名') or contains(@placeholder,'账号') or contains(@placeholder,'学工号') or contains(@placeholder,'手机号') or contains(@placeholder,'邮箱')]") ,
-                (By.XPATH, "//input[@type='text' or @type='email' or @type='tel']"),
-            ]
-            pwd_selectors = [
-                (By.CSS_SELECTOR, "input[type='password']"),
-                (By.CSS_SELECTOR, "input[name='password']"),
-                (By.CSS_SELECTOR, "input#password"),
-                (By.CSS_SELECTOR, "input[name='passwordPre']"),
-                (By.XPATH, "//input[contains(@placeholder,'密码') and @type='password']"),
-            ]
-
-            user_el = _find_interactable(user_selectors, timeout=15)
-            pwd_el = _find_interactable(pwd_selectors, timeout=15)
+            user_el = _find_interactable(_USER_SELECTORS, timeout=15)
+            pwd_el = _find_interactable(_PWD_SELECTORS, timeout=15)
             if not user_el or not pwd_el:
                 return False
 
             # 填充用户名
             try:
-                try:
-                    user_el.clear()
-                except Exception:
-                    pass
-                WebDriverWait(self.driver, 3).until(ec.element_to_be_clickable(user_el))
-                try:
-                    user_el.click()
-                except Exception:
-                    pass
-                user_el.send_keys(username)
+                _type_into(user_el, username)
             except Exception:
                 # 兜底：通过 JS 注入值
                 try:
@@ -230,16 +422,11 @@ class HDU:
 
             # 填充密码
             try:
-                try:
-                    pwd_el.clear()
-                except Exception:
-                    pass
-                WebDriverWait(self.driver, 3).until(ec.element_to_be_clickable(pwd_el))
-                try:
-                    pwd_el.click()
-                except Exception:
-                    pass
-                pwd_el.send_keys(password)
+                _type_into(pwd_el, password)
+                # 若密码经 CDP 误插入了用户名框（焦点未切换），用户名框的值也会被污染，需重新填写
+                if user_el.get_attribute("value") != username:
+                    user_el.clear()
+                    user_el.send_keys(username)
             except Exception:
                 # 兜底：通过 JS 注入值
                 try:
@@ -265,14 +452,30 @@ class HDU:
             logger.info("已自动填入账号密码")
             return True
 
+        # 快速路径：一次 execute_script 完成填充与提交，未能提交时再走下面逐步交互的慢路径
+        try:
+            submitted_pwd = self.driver.execute_script(_FILL_AND_SUBMIT_JS, _USER_CSS, _PWD_CSS, username, password)
+        except Exception:
+            submitted_pwd = None
+        submitted = submitted_pwd is not None
+        if submitted:
+            # 已点击提交即不再重复提交：SSO 较慢、出现验证码或密码错误时再次提交可能导致账号被锁定
+            pwd_gone = ec.staleness_of(submitted_pwd)
+            try:
+                self._wait_until(lambda d: pwd_gone(d) or "sso.hdu.edu.cn/login" not in d.current_url, 5)
+                logger.info("已自动填入账号密码并提交登录表单")
+            except Exception:
+                logger.warning("已提交登录表单，但登录页尚未跳转（可能响应较慢、需要验证码或密码错误），不再重复提交")
+
         # 先在主文档尝试
-        filled = _fill_inputs_in_current_context()
+        filled = submitted or _fill_inputs_in_current_context()
 
         # 若主文档未找到，尝试在 iframe 中查找
         frame_used = None
         if not filled:
+            # 一次往返筛出候选 iframe，跳过确定没有登录表单的同源 iframe（每个都要等满查找超时）
             try:
-                iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
+                iframes = self.driver.execute_script(_LOGIN_FRAME_CANDIDATES_JS, _USER_CSS, _PWD_CSS) or []
             except Exception:
                 iframes = []
             for idx, frame in enumerate(iframes):
@@ -280,71 +483,70 @@ class HDU:
                     self.driver.switch_to.default_content()
                     self.driver.switch_to.frame(frame)
                     if _fill_inputs_in_current_context():
-                        logger.debug(f"在第 {idx} 个 iframe 中找到并填充了登录表单")
+                        # 停留在该 iframe 中，直接在同一上下文里查找登录按钮
+                        logger.debug(f"在第 {idx} 个候选 iframe 中找到并填充了登录表单")
                         filled = True
                         frame_used = frame
                         break
                 except Exception:
                     continue
-            try:
-                self.driver.switch_to.default_content()
-            except Exception:
-                pass
+            if frame_used is None:
+                try:
+                    self.driver.switch_to.default_content()
+                except Exception:
+                    pass
 
         # 点击登录/提交按钮
         if filled:
-            # 若在某个 iframe 中完成填充，则切换到该 iframe 再查找登录按钮
-            if 'frame_used' in locals() and frame_used is not None:
+            clicked = submitted
+            pwd_el = getattr(self, "_last_pwd_el", None)
+            if not clicked and pwd_el is not None:
+                # 先在密码框回车提交（一次往返）。回车发出即视为已提交：SSO 较慢或经同域中间页跳转时
+                # 再点登录按钮会重复提交（可能触发验证码/限流），只有密码框仍留在页面上才改为点击按钮
                 try:
-                    self.driver.switch_to.default_content()
-                    self.driver.switch_to.frame(frame_used)
-                    logger.debug("已切换到包含登录按钮的 iframe，准备点击提交")
+                    pwd_el.send_keys(Keys.ENTER)
+                    clicked = True
                 except Exception:
                     pass
-            submit_candidates = [
-                (By.XPATH, "//button[contains(., '登录') or contains(., '登 录')]") ,
-                (By.XPATH, "//span[normalize-space(text())='登录' or normalize-space(text())='登 录']/ancestor::*[self::button or self::a][1]"),
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.CSS_SELECTOR, "input[type='submit']"),
-                (By.CSS_SELECTOR, "button.login-btn"),
-                (By.CSS_SELECTOR, "button.el-button--primary"),
-            ]
-            clicked = False
-            for by, sel in submit_candidates:
-                try:
-                    btns = self.driver.find_elements(by, sel)
-                    btn = None
-                    for b in btns:
-                        try:
-                            if b.is_displayed() and b.is_enabled():
-                                btn = b
-                                break
-                        except Exception:
-                            continue
-                    if not btn:
-                        continue
+                if clicked:
+                    pwd_gone = ec.staleness_of(pwd_el)
                     try:
-                        WebDriverWait(self.driver, 5).until(ec.element_to_be_clickable(btn))
+                        self._wait_until(
+                            lambda d: pwd_gone(d) or "sso.hdu.edu.cn/login" not in d.current_url, 5
+                        )
+                        logger.info("已通过回车提交登录表单")
+                    except TimeoutException:
+                        # 密码框仍在且未离开登录页：回车没有触发提交
+                        clicked = False
                     except Exception:
                         pass
-                    try:
-                        btn.click()
-                    except Exception:
-                        self.driver.execute_script("arguments[0].click();", btn)
-                    logger.info("已尝试自动点击登录按钮")
-                    clicked = True
-                    break
-                except Exception:
-                    continue
             if not clicked:
-                # 尝试通过回车提交
-                try:
-                    if getattr(self, "_last_pwd_el", None):
-                        self._last_pwd_el.send_keys(Keys.ENTER)
-                        logger.info("已尝试通过回车提交登录表单")
+                for by, sel in _SUBMIT_CANDIDATES:
+                    try:
+                        btns = self.driver.find_elements(by, sel)
+                        btn = None
+                        for b in btns:
+                            try:
+                                if b.is_displayed() and b.is_enabled():
+                                    btn = b
+                                    break
+                            except Exception:
+                                continue
+                        if not btn:
+                            continue
+                        try:
+                            self._wait_until(ec.element_to_be_clickable(btn), 5)
+                        except Exception:
+                            pass
+                        try:
+                            btn.click()
+                        except Exception:
+                            self.driver.execute_script("arguments[0].click();", btn)
+                        logger.info("已尝试自动点击登录按钮")
                         clicked = True
-                except Exception:
-                    pass
+                        break
+                    except Exception:
+                        continue
             if not clicked:
                 # JS 兜底提交
                 try:
@@ -356,12 +558,13 @@ class HDU:
                         "var visible = !!(b.offsetWidth || b.offsetHeight || b.getClientRects().length);"
                         "if (visible && !b.disabled){"
                         "var txt = (b.innerText || b.value || '').trim();"
-                        "if (txt.indexOf('登录') !== -1 || txt.indexOf('登 录') !== -1 || b.type === 'submit'){"
+                        "if (txt.indexOf('登录') !== -1 || txt.indexOf('登 录') !== -1){"
                         "try{ b.click(); return; }catch(e){}"
                         "}"
                         "}"
                         "}"
-                        "var f = document.querySelector('form');"
+                        "var pwd = document.querySelector('input[type=\"password\"]');"
+                        "var f = (pwd && pwd.form) || document.querySelector('form');"
                         "if (f){ try{ f.dispatchEvent(new Event('submit',{bubbles:true,cancelable:true})); }catch(e){} try{ f.submit(); }catch(e){} }"
                         "})();"
                     )
@@ -371,10 +574,15 @@ class HDU:
                     pass
             if not clicked:
                 logger.warning("未能自动点击登录按钮，请手动点击登录。")
+            if frame_used is not None:
+                try:
+                    self.driver.switch_to.default_content()
+                except Exception:
+                    pass
 
             # 等待从 SSO 页面跳转完成
             try:
-                WebDriverWait(self.driver, 10).until(lambda d: "sso.hdu.edu.cn/login" not in d.current_url)
+                self._wait_until(lambda d: "sso.hdu.edu.cn/login" not in d.current_url, 10)
             except Exception:
                 pass
         else:
@@ -382,26 +590,26 @@ class HDU:
 
         # 不论是否自动点了登录，都导航到业务页面继续后续流程（若 SSO 已登录，将自动带票登录）
         try:
-            self.driver.get("https://skl.hdu.edu.cn/#/english/list")
+            self.driver.get(_LIST_URL)
         except Exception:
             pass
 
-    def find_question(self) -> Tuple[str, List[str]]:
-        """提取题目和选项"""
+    def find_question(self) -> Optional[Tuple[str, List[str]]]:
+        """提取题目和选项；页面上没有完整题目时返回 None。"""
+        data = self.driver.execute_script(_FIND_QUESTION_JS)
+        if not data:
+            return None
+
         # 提取题目文本（去除末尾标点）
-        span_elements = self.driver.find_element(By.CLASS_NAME, "van-col--17").find_elements(By.TAG_NAME, "span")
-        question = span_elements[1].text.strip()[:-2]
+        question = data["question"].strip()[:-2]
 
         # 处理选项文本（去除序号和多余字符）
-        options = self.driver.find_elements(By.CLASS_NAME, "van-cell__title")
-        options_list = [re.sub(r'\s.', '', opt.text[3:]) for opt in options[:4]]
+        self._option_elements = data["elements"]
+        options_list = [_OPT_CLEAN_RE.sub('', text[3:]) for text in data["texts"]]
 
         # 格式化输出题目信息（日志）
-        logger.info(f"{question}")
-        logger.debug(f"A: {options_list[0]}")
-        logger.debug(f"B: {options_list[1]}")
-        logger.debug(f"C: {options_list[2]}")
-        logger.debug(f"D: {options_list[3]}")
+        logger.info(question)
+        logger.debug("A: {}\nB: {}\nC: {}\nD: {}", *options_list)
 
         return question, options_list
 
@@ -430,46 +638,65 @@ class HDU:
     def click_answer(self, index: int) -> None:
         """点击答案选项，-1时点击下一题。"""
         if index == -1:
-            next_button = self.driver.find_element(
-                By.XPATH, '//*[@id="app"]/div/div[3]/div/div[5]/div[1]/div[3]/button'
-            )
-            next_button.click()
+            if not self.driver.execute_script(_CLICK_NEXT_JS, _NEXT_BTN_CSS):
+                raise NoSuchElementException(f"未找到下一题按钮: {_NEXT_BTN_CSS}")
         else:
-            options = self.driver.find_elements(By.CLASS_NAME, "van-cell__title")
             logger.info(chr(index + 65))
-            options[index].click()
+            try:
+                # 复用 find_question 缓存的选项元素，省去一次查找；用过即清空，避免下一题误用旧元素
+                option = self._option_elements[index]
+                self._option_elements = []
+                option.click()
+            except (IndexError, StaleElementReferenceException):
+                # 元素已失效时在页面内按下标重新定位并点击，仍只需一次往返
+                self.driver.execute_script(
+                    "document.getElementsByClassName(arguments[0])[arguments[1]].click();", _OPTION_CLASS, index
+                )
+
+    def _wait_next_question(self, question: str, timeout: float = 5) -> None:
+        """点击答案后等待页面切换到下一题（题目文本变化），取代固定的 1 秒延迟。"""
+        def _question_changed(driver) -> bool:
+            text = driver.execute_script(_QUESTION_TEXT_JS)
+            return text is not None and text.strip()[:-2] != question
+
+        try:
+            self._wait_until(_question_changed, timeout)
+        except TimeoutException:
+            # 最后一题作答后题目不会再变化，交由主循环的重复题目检测处理
+            logger.debug("等待下一题超时，可能已是最后一题")
 
     def wait(self):
         """执行交卷前的等待和提交操作（基于计时器）"""
         logger.info("答题完成，准备提交...")
+        self.answering_completed.set()
+        close_error_log()
         logger.info("错误题目已保存至 error.txt")
 
         # 检查计时器状态
-        with self.timer_lock:
-            if self.timer_expired:
-                # 时间已到，立即提交
-                logger.info("计时时间已到，立即提交")
-            else:
-                # 时间未到，等待计时器到期
-                logger.info("答题已完成，等待计时器到期后提交...")
+        if self.timer_expired.is_set():
+            # 时间已到，立即提交
+            logger.info("计时时间已到，立即提交")
+        else:
+            # 时间未到，等待计时器到期
+            logger.info("答题已完成，等待计时器到期后提交...")
         
         # 等待计时器到期（如果还没到期的话）
-        while True:
-            with self.timer_lock:
-                if self.timer_expired:
-                    break
-            time.sleep(0.5)
+        self.timer_expired.wait()
         
         logger.info("开始提交...")
         
         # 交卷
         try:
-            submit_btn = self.driver.find_element(By.CLASS_NAME, "van-nav-bar__right")
+            submit_btn = self.driver.find_element(By.CLASS_NAME, _PAPER_SUBMIT_CLASS)
             submit_btn.click()
-            time.sleep(1)
-            check_btn = self.driver.find_element(By.CSS_SELECTOR, ".van-dialog__confirm.van-hairline--left")
+            # 确认弹窗可点击即继续，不再固定等待
+            check_btn = self._wait_until(ec.element_to_be_clickable(_CONFIRM_LOCATOR))
             check_btn.click()
-            time.sleep(1)
+            # 等待确认弹窗关闭，表示提交已被页面受理
+            try:
+                self._wait_until(ec.invisibility_of_element_located(_CONFIRM_CLOSED_LOCATOR))
+            except TimeoutException:
+                logger.debug("确认弹窗未在预期时间内关闭")
             logger.info("提交完成。")
         except Exception as e:
             logger.error(f"提交失败，请手动操作！错误信息：{str(e)}")
@@ -497,17 +724,17 @@ class HDU:
             logger.info(f"答题时间: {self.answer_time_seconds} 秒")
             logger.info(f"期望分数: {self.expected_score} 分")
 
-            # 如果密码已配置，直接使用 api_mode_answer 函数
-            # 该函数会提示用户选择考试模式或自测模式
-            from .hdu_api_client import api_mode_answer
+            # 如果密码已配置，先选择考试模式或自测模式，再直接使用 api_mode_answer 函数
+            from .hdu_api_client import api_mode_answer, prompt_exam_type
 
+            exam_type = prompt_exam_type()
             success = api_mode_answer(
                 self.username,
                 self.password,
                 self.expected_score,
                 self.answer_time_seconds,
                 self.question_processor,  # 传递 QuestionProcessor 实例
-                exam_type=None  # None 表示提示用户输入
+                exam_type
             )
 
             if success:
@@ -531,13 +758,14 @@ class HDU:
 
         # 从浏览器提取 X-Auth-Token
         logger.info("尝试从浏览器会话中提取 X-Auth-Token...")
-        from .hdu_api_client import extract_token_from_browser, HDUApiClient
+        from .hdu_api_client import extract_token_from_browser, prompt_exam_type, api_mode_answer
         x_auth_token = extract_token_from_browser(self.driver)
 
         if not x_auth_token:
             logger.error("无法从浏览器提取 X-Auth-Token，任务失败")
             if self.driver:
                 self.driver.quit()
+                self.driver = None
             return
 
         logger.success("成功从浏览器提取 X-Auth-Token")
@@ -551,134 +779,44 @@ class HDU:
         logger.info("切换回 API 模式完成任务...")
 
         # 提示用户选择模式
-        logger.info("=" * 50)
-        logger.info("请选择模式:")
-        logger.info("0 - 自测模式 (Self-test)")
-        logger.info("1 - 考试模式 (Exam)")
-        logger.info("=" * 50)
-
-        exam_type = None
-        while True:
-            choice = input("请输入 0 或 1: ").strip()
-            if choice in ['0', '1']:
-                exam_type = choice
-                mode_name = "自测模式" if choice == '0' else "考试模式"
-                logger.info(f"已选择: {mode_name}")
-                break
-            else:
-                logger.warning("无效输入，请输入 0 或 1")
-
-        # 使用获取的 token 完成答题任务
-        api_client = HDUApiClient(x_auth_token)
-
-        # 获取当前周次
-        week = api_client.fetch_current_week()
-        if not week:
-            logger.error("获取当前周次失败")
-            return
-
-        # 获取新试卷
-        logger.info(f"Getting paper with type={exam_type} (0=自测, 1=考试)...")
-        paper_data = api_client.get_new_paper(week, exam_type=exam_type)
-        if not paper_data:
-            logger.error("获取试卷失败")
-            return
-
-        paper_id = paper_data.get('paperId')
-        questions = paper_data.get('list', [])
-
-        if not paper_id or not questions:
-            logger.error("试卷数据无效")
-            return
-
-        logger.info(f"开始处理 {len(questions)} 道题目...")
-
-        # 答题逻辑
-        start_time = time.time()
-        final_answers = []
-
-        # 计算需要答错的题目数量
-        wrong_count = 100 - self.expected_score
-        if wrong_count < 0:
-            wrong_count = 0
-        elif wrong_count > len(questions):
-            wrong_count = len(questions)
-
-        # 随机选择需要答错的题目索引
-        wrong_indices = set()
-        if wrong_count > 0:
-            wrong_indices = set(random.sample(range(len(questions)), wrong_count))
-            logger.info(f"期望分数: {self.expected_score} 分，将随机做错 {wrong_count} 题")
-
-        # 重新加载题库以确保最新
-        self.question_processor.reload_question_bank()
-
-        for idx, question in enumerate(questions):
-            paper_detail_id = question.get('paperDetailId')
-            title = question.get('title', '').strip().rstrip('.')
-            option_a = question.get('answerA', '').strip().rstrip('.')
-            option_b = question.get('answerB', '').strip().rstrip('.')
-            option_c = question.get('answerC', '').strip().rstrip('.')
-            option_d = question.get('answerD', '').strip().rstrip('.')
-
-            options = [option_a, option_b, option_c, option_d]
-
-            # 使用 QuestionProcessor 获取答案
-            correct_answer_idx = self.question_processor.get_answer_index(title, options)
-
-            correct_answer = None
-            if correct_answer_idx != -1:
-                correct_answer = chr(correct_answer_idx + 65)
-
-            # 如果仍未找到答案，默认选 A
-            if not correct_answer:
-                correct_answer = 'A'
-                logger.warning(f"题目 '{title}' 未找到答案，默认选择 A")
-
-            # 确定最终答案（是否需要故意答错）
-            final_answer_char = correct_answer
-            if idx in wrong_indices:
-                # 获取一个错误答案
-                wrong_options = [chr(i + 65) for i in range(4) if chr(i + 65) != correct_answer]
-                if wrong_options:
-                    final_answer_char = random.choice(wrong_options)
-                    logger.info(f"故意做错第 {idx + 1} 题，选择 {final_answer_char} 而不是 {correct_answer}")
-
-            final_answers.append({
-                "paperDetailId": paper_detail_id,
-                "answer": final_answer_char
-            })
-
-        # 检查答题用时
-        elapsed_time = time.time() - start_time
-        remaining_time = self.answer_time_seconds - elapsed_time
-        if remaining_time > 0:
-            logger.info(f"等待 {remaining_time:.1f} 秒以满足答题时间要求...")
-            time.sleep(remaining_time)
-
-        # 提交答案
-        logger.info("提交答案...")
-        if api_client.submit_paper(paper_id, final_answers):
+        exam_type = prompt_exam_type()
+
+        # 使用获取的 token 走与密码登录相同的 API 答题流程
+        success = api_mode_answer(
+            self.username,
+            None,
+            self.expected_score,
+            self.answer_time_seconds,
+            self.question_processor,
+            exam_type,
+            x_auth_token=x_auth_token,
+        )
+        if success:
             logger.success("API 模式答题成功！")
         else:
             logger.error("API 模式答题失败。")
 
     def _init_browser_driver(self):
-        """Initializes the browser driver if it's not already initialized."""
-        if self.driver is None:
-            logger.info("Initializing browser driver for token extraction...")
-            options = webdriver.ChromeOptions()
-            options.add_experimental_option('mobileEmulation', {'deviceName': 'iPhone 6'})
-            driver_path = load_chrome_driver_path()
-            try:
-                if driver_path and os.path.exists(driver_path):
-                    service = Service(executable_path=driver_path)
-                    self.driver = webdriver.Chrome(options=options, service=service)
-                else:
-                    self.driver = webdriver.Chrome(options=options)
-            except Exception as e:
-                logger.error(f"Failed to initialize Chrome driver: {e}")
-                raise
+        """初始化浏览器驱动（已初始化则跳过）。
+
+        优先使用 config.yaml 中的 chrome_driver_path；否则交给 Selenium Manager 或 PATH。
+        """
+        if self.driver is not None:
+            return
+        options = self._build_chrome_options()
+        driver_path = load_chrome_driver_path()
+        try:
+            if driver_path and os.path.exists(driver_path):
+                service = Service(executable_path=driver_path)
+                self.driver = webdriver.Chrome(options=options, service=service)
+            else:
+                if driver_path:
+                    logger.warning(f"配置的 chrome_driver_path 路径不存在：{driver_path}，将尝试使用默认驱动（Selenium Manager 或 PATH）。")
+                self.driver = webdriver.Chrome(options=options)
+        except Exception as e:
+            logger.error(f"初始化 Chrome 驱动失败：{e}")
+            raise
+        self._block_heavy_resources()
 
     def _start_browser_mode(self):
         """浏览器模式的主控制流程"""
@@ -695,8 +833,12 @@ class HDU:
 
         logger.info("登录成功，准备答题...")
 
+        # 等待用户开始考试期间在后台加载题库与 AI 配置，避免第一题时才加载
+        prewarm = threading.Thread(target=self._prewarm_question_processor, daemon=True)
+        prewarm.start()
         input("请手动开始考试后按回车继续")
         self._start_timer()  # 从摁下回车开始计时
+        prewarm.join()
 
         # 主答题循环
         question_options = None
@@ -746,8 +888,8 @@ class HDU:
                 # 标记该题目已回答
                 answered_questions.add(question_key)
 
-                # 人为延迟，避免操作过快
-                time.sleep(1)
+                # 等待页面切换到下一题
+                self._wait_next_question(question)
         except Exception as e:
             logger.error(f"答题过程中发生错误：{e}")
             if question_options:
@@ -1,29 +1,106 @@
 # -*- coding: utf-8 -*-
 """Loguru logging configuration utilities."""
+import atexit
+import collections
 import os
+import threading
 import yaml
 from loguru import logger
 
-VALID_LOG_LEVELS = {"TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"}
+from .config_loader import _read_config
+
+VALID_LOG_LEVELS = frozenset({"TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"})
+
+# Upper bound on messages waiting for the writer thread; a stalled disk drops the oldest
+# lines instead of growing memory without limit.
+_LOG_QUEUE_MAXSIZE = 10000
+# Most messages the writer thread joins into a single write() call.
+_LOG_BATCH_SIZE = 256
+# Seconds the writer thread sleeps between drains of the pending messages.
+_LOG_POLL_INTERVAL = 0.01
+
+# Set once the run.log sink is added, so a second init does not attach a duplicate sink
+_initialized = False
+
+
+class _BackgroundFileSink:
+    """Loguru sink that hands formatted messages to a writer thread owning the log file.
+
+    Unlike enqueue=True (a multiprocessing.SimpleQueue, which pickles every record in the
+    calling thread), the caller only pays for a deque append; the file is opened once (so
+    OSError surfaces here, to the caller) and the writer thread polls and drains the deque
+    in batches, so callers never wake it per message. Batches go straight to an O_APPEND
+    descriptor with os.write, skipping Python's buffered/text I/O layers.
+    """
+
+    def __init__(self, path: str, maxsize: int = _LOG_QUEUE_MAXSIZE):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(path, flags, 0o644)
+        # A full deque discards from the left, i.e. drops the oldest pending message
+        self._pending: "collections.deque" = collections.deque(maxlen=maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain, name="run-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, message) -> None:
+        """Loguru sink callable: queue the formatted message for the writer thread (never blocks)."""
+        self._pending.append(message)
+
+    def _drain(self) -> None:
+        pending, fd = self._pending, self._fd
+        try:
+            while True:
+                stopping = self._stop.wait(_LOG_POLL_INTERVAL)
+                batch = []
+                try:
+                    while True:
+                        batch.append(pending.popleft())
+                except IndexError:
+                    pass
+                try:
+                    for i in range(0, len(batch), _LOG_BATCH_SIZE):
+                        data = memoryview("".join(batch[i:i + _LOG_BATCH_SIZE]).encode("utf-8"))
+                        while data:
+                            data = data[os.write(fd, data):]
+                except OSError:
+                    # Keep draining; a failed write should not stall callers
+                    pass
+                if stopping:
+                    return
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        """Write out everything queued so far and stop the writer thread."""
+        self._stop.set()
+        self._thread.join(timeout=5)
+
 
 def init_logger_from_config() -> None:
     """Initialize Loguru file sink based on config.yaml's log_level (default INFO).
-    This keeps console logging and adds run.log file logging.
+    This keeps console logging and adds run.log file logging; repeated calls are no-ops.
     """
+    global _initialized
+    if _initialized:
+        return
     level = "INFO"
     try:
-        if os.path.exists("config.yaml"):
-            with open("config.yaml", "r", encoding="utf-8") as f:
-                cfg = yaml.safe_load(f) or {}
-            cfg_level = str(cfg.get("log_level", "")).strip().upper()
-            if cfg_level in VALID_LOG_LEVELS:
-                level = cfg_level
-    except Exception:
-        # Ignore errors and keep default level
+        # Shares config_loader's mtime-keyed parse cache, so later loaders reuse this parse
+        cfg = _read_config("config.yaml")
+        cfg_level = str(cfg.get("log_level", "")).strip().upper()
+        if cfg_level in VALID_LOG_LEVELS:
+            level = cfg_level
+    except FileNotFoundError:
+        # No config.yaml: keep default level
+        pass
+    except (OSError, yaml.YAMLError, UnicodeDecodeError, AttributeError):
+        # Unreadable or malformed config (AttributeError: top level is not a mapping): keep default level
         pass
     try:
-        logger.add("run.log", level=level, encoding="utf-8", enqueue=True)
-        logger.info(f"日志初始化，等级: {level}，文件: run.log")
-    except Exception:
+        logger.add(_BackgroundFileSink("run.log").put, level=level)
+        _initialized = True
+        logger.info("日志初始化，等级: {}，文件: {}", level, "run.log")
+    except OSError:
         # Ignore file sink errors; console logging remains
         pass
@@ -8,13 +8,30 @@ from __future__ import annotations
 import json
 import os
 import re
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 from loguru import logger
 
-from .ai_client import ai_choose_answer
+try:
+    import orjson  # optional: faster parsing of large question banks
+except ImportError:
+    orjson = None
+
+from .ai_client import ai_choose_answer, ai_choose_answers_batch
 from .utils import save_error
 
+# Patterns used on every lookup, compiled once at import
+_SEP_RE = re.compile(r"\s*[|｜]\s*")
+_TRAILING_PUNCT_RE = re.compile(r"[\s\W]+$")
+
+# str.translate table deleting every character r"\s" matches (all of them are <= U+3000)
+_WS_TABLE = dict.fromkeys(i for i in range(0x3001) if chr(i).isspace())
+
+# Append-only log of persisted answers; folded back into questions.json at startup
+_JOURNAL_PATH = "questions.jsonl"
+
 
 class QuestionProcessor:
     """
@@ -29,93 +46,245 @@ class QuestionProcessor:
         Args:
             ai_config: AI configuration dictionary.
         """
-        self.question_bank = self._load_question_bank()
+        self.question_bank = self._load_question_bank(compact=True)
+        self._rebuild_indexes()
         self.ai_config = ai_config
+        self._persist_lock = threading.Lock()  # 多账号并行时串行化题库写入
+        self._journal = None  # questions.jsonl, opened on the first persisted answer
 
     def reload_question_bank(self):
-        """Reloads the question bank from the file."""
-        self.question_bank = self._load_question_bank()
+        """Reloads the question bank from the file.
+
+        Runs under _persist_lock and builds the new bank and its indexes in locals before
+        swapping them in, so a concurrent _persist_answer is neither lost nor paired with
+        stale indexes.
+        """
+        with self._persist_lock:
+            bank = self._load_question_bank()
+            index = self._build_question_index(bank)
+            meanings = {key: self._split_meanings(value) for key, value in bank.items()}
+            self.question_bank, self._question_index, self._meanings = bank, index, meanings
         logger.info("Question bank reloaded.")
 
+    @classmethod
+    def _load_question_bank(cls, compact: bool = False) -> Dict[str, Any]:
+        """
+        Loads the question bank from questions.json and replays questions.jsonl on top.
+
+        Args:
+            compact: Also write the merged bank back to questions.json and truncate
+                the journal (done once at startup).
+        """
+        bank = cls._read_bank_file()
+        intact = bank is not None
+        if bank is None:
+            bank = {}
+        if cls._replay_journal(bank) and compact and intact:
+            try:
+                cls._write_bank_file(bank)
+                open(_JOURNAL_PATH, "w", encoding="utf-8").close()
+                logger.info("Merged questions.jsonl into questions.json.")
+            except Exception as e:
+                logger.warning(f"Failed to merge questions.jsonl into questions.json: {e}")
+        return bank
+
     @staticmethod
-    def _load_question_bank() -> Dict[str, Any]:
-        """Loads the question bank from questions.json."""
+    def _read_bank_file() -> Optional[Dict[str, Any]]:
+        """Reads questions.json; returns {} if it is missing and None if it cannot be parsed."""
         try:
+            if orjson is not None:
+                with open("questions.json", 'rb') as file:
+                    return orjson.loads(file.read())
             with open("questions.json", 'r', encoding='utf-8') as file:
                 return json.load(file)
         except FileNotFoundError:
             logger.warning("File questions.json not found. Starting with an empty question bank.")
             return {}
-        except json.JSONDecodeError:
+        except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError
             logger.error("File questions.json is not a valid JSON. Starting with an empty question bank.")
-            return {}
+            return None
         except Exception as e:
             logger.error(f"An unknown error occurred while loading the question bank: {e}")
-            return {}
+            return None
+
+    @staticmethod
+    def _write_bank_file(bank: Dict[str, Any]) -> None:
+        """Atomically rewrites questions.json with the given bank."""
+        tmp_path = "questions.json.tmp"
+        if orjson is not None:
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(bank, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(bank, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, "questions.json")
+
+    @staticmethod
+    def _journal_line(question: str, value: Any) -> bytes:
+        """Encodes one questions.jsonl entry as a UTF-8 line, using orjson when available."""
+        if orjson is not None:
+            return orjson.dumps({question: value}) + b"\n"
+        return (json.dumps({question: value}, ensure_ascii=False) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _replay_journal(bank: Dict[str, Any]) -> int:
+        """Applies questions.jsonl entries to bank in order; returns how many were applied."""
+        applied = 0
+        try:
+            loads = orjson.loads if orjson is not None else json.loads
+            with open(_JOURNAL_PATH, 'rb') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        bank.update(loads(line))
+                        applied += 1
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable line in {_JOURNAL_PATH}: {line[:80]!r}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to read {_JOURNAL_PATH}: {e}")
+        return applied
+
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """Normalizes a question title for lookup: trims trailing whitespace/punctuation and casefolds."""
+        return _TRAILING_PUNCT_RE.sub("", str(question).strip()).casefold()
+
+    @classmethod
+    def _build_question_index(cls, bank: Dict[str, Any]) -> Dict[str, str]:
+        """Maps normalized question titles to their original keys in the bank."""
+        index: Dict[str, str] = {}
+        for key in bank:
+            index.setdefault(cls._normalize_question(key), key)
+        return index
+
+    @staticmethod
+    def _raw_meanings(value: Any) -> List[str]:
+        """Splits a bank entry ("a | b" strings, lists of them, or scalars) into its meanings, in bank order."""
+        meanings: List[str] = []
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, str):
+                    meanings.extend(p for p in _SEP_RE.split(item) if p.strip())
+                else:
+                    meanings.append(str(item).strip())
+        elif isinstance(value, str):
+            meanings.extend(p for p in _SEP_RE.split(value) if p.strip())
+        elif value is not None:
+            meanings.append(str(value).strip())
+        return meanings
+
+    @classmethod
+    def _split_meanings(cls, value: Any) -> List[str]:
+        """Splits a bank entry into its normalized meanings, in bank order and without duplicates."""
+        seen_norm = set()
+        unique_ordered_meanings = []
+        for meaning in cls._raw_meanings(value):
+            norm_meaning = cls._normalize_text(meaning)
+            if norm_meaning and norm_meaning not in seen_norm:
+                seen_norm.add(norm_meaning)
+                unique_ordered_meanings.append(norm_meaning)
+        return unique_ordered_meanings
+
+    def _rebuild_indexes(self) -> None:
+        """Rebuilds the lookup index and the pre-normalized meanings for the in-memory bank."""
+        self._question_index = self._build_question_index(self.question_bank)
+        self._meanings = {key: self._split_meanings(value) for key, value in self.question_bank.items()}
+
+    def _lookup_meanings(self, question: str) -> List[str]:
+        """Returns the normalized meanings stored for a question, tolerating whitespace/punctuation/case differences."""
+        meanings = self._meanings.get(question)
+        if meanings is None:
+            key = self._question_index.get(self._normalize_question(question))
+            if key is not None:
+                meanings = self._meanings.get(key)
+        return meanings or []
 
     @staticmethod
     def _normalize_text(s: str) -> str:
         """Normalizes a string for comparison by removing all whitespace."""
         try:
-            return re.sub(r"\s+", "", str(s)).strip()
+            return str(s).translate(_WS_TABLE)
         except Exception:
             return str(s).strip()
 
     def _persist_answer(self, question: str, chosen_answer: str) -> None:
         """
-        Writes the AI-determined answer to the questions.json file.
+        Records the AI-determined answer in the question bank.
 
         - If the question is new, it's added.
         - If the question exists, the new meaning is appended (if not already present).
+
+        The merged entry is appended to questions.jsonl rather than rewriting the
+        whole questions.json; the journal is folded into questions.json at startup.
         """
         try:
             chosen_answer = str(chosen_answer).strip()
             if not chosen_answer:
                 return
 
-            # Use a temporary copy for modification
-            current_bank = self._load_question_bank()
-
-            existing = current_bank.get(question)
-            action = ""
-            if existing is None:
-                current_bank[question] = chosen_answer
-                action = "Added"
-            else:
-                meanings: List[str] = []
-                if isinstance(existing, list):
-                    for item in existing:
-                        if isinstance(item, str):
-                            parts = re.split(r"\s*[|｜]\s*", item)
-                            meanings.extend(p for p in parts if p.strip())
-                        else:
-                            meanings.append(str(item).strip())
-                elif isinstance(existing, str):
-                    meanings.extend(p for p in re.split(r"\s*[|｜]\s*", existing) if p.strip())
-                else:
-                    meanings = [str(existing).strip()]
+            with self._persist_lock:
+                # The in-memory bank already includes questions.json and the journal; update it in place
+                current_bank = self.question_bank
+                # Merge into the entry a lookup would hit, even if its title differs in case/punctuation
+                if question not in current_bank:
+                    question = self._question_index.get(self._normalize_question(question), question)
 
-                seen = {self._normalize_text(m) for m in meanings}
-
-                if self._normalize_text(chosen_answer) not in seen:
-                    meanings.append(chosen_answer)
-                    action = "Appended meaning"
+                existing = current_bank.get(question)
+                action = ""
+                if existing is None:
+                    current_bank[question] = chosen_answer
+                    action = "Added"
                 else:
-                    action = "Already exists, no update needed"
-
-                current_bank[question] = " | ".join(meanings)
+                    meanings = self._raw_meanings(existing)
+                    # Normalized meanings are cached per entry; recompute only if the cache lacks it
+                    seen = self._meanings.get(question) or self._split_meanings(existing)
+                    if self._normalize_text(chosen_answer) not in seen:
+                        meanings.append(chosen_answer)
+                        current_bank[question] = " | ".join(meanings)
+                        action = "Appended meaning"
+                    else:
+                        action = "Already exists, no update needed"
 
-            if "Added" in action or "Appended" in action:
-                tmp_path = "questions.json.tmp"
-                with open(tmp_path, "w", encoding="utf-8") as f:
-                    json.dump(current_bank, f, ensure_ascii=False, indent=2)
-                os.replace(tmp_path, "questions.json")
-                self.question_bank = current_bank # Update in-memory bank
-                logger.success(f"{action} to question bank: {question} -> {current_bank[question]}")
+                if "Added" in action or "Appended" in action:
+                    if self._journal is None:
+                        # Unbuffered: each entry reaches the file as soon as it is written
+                        self._journal = open(_JOURNAL_PATH, "ab", buffering=0)
+                    self._journal.write(self._journal_line(question, current_bank[question]))
+                    # Refresh only this question's lookup entries
+                    self._meanings[question] = self._split_meanings(current_bank[question])
+                    self._question_index.setdefault(self._normalize_question(question), question)
+                    logger.success(f"{action} to question bank: {question} -> {current_bank[question]}")
 
         except Exception as e:
             logger.warning(f"Failed to write to question bank: {e}")
 
+    def _find_in_bank(self, question: str, options: List[str]) -> int:
+        """
+        Looks up the answer in the local question bank only.
+
+        Supports multi-meaning entries; when several options match, the meaning
+        listed first in the bank wins.
+
+        Returns:
+            The index (0-3) of the matching option, or -1 if not found.
+        """
+        meanings = self._lookup_meanings(question)
+        if not meanings:
+            return -1
+        # Normalize each option once; the first option wins if two normalize the same
+        option_index: Dict[str, int] = {}
+        for i, opt in enumerate(options):
+            option_index.setdefault(self._normalize_text(opt), i)
+        for norm_meaning in meanings:
+            i = option_index.get(norm_meaning)
+            if i is not None:
+                return i
+        return -1
+
     def get_answer_index(self, question: str, options: List[str]) -> int:
         """
         Finds the answer for a given question and its options.
@@ -131,30 +300,9 @@ class QuestionProcessor:
             The index (0-3) of the correct answer, or -1 if not found.
         """
         # 1. Search in the local question bank
-        expected_answers = self.question_bank.get(question)
-        if expected_answers:
-            ordered_meanings: List[str] = []
-            if isinstance(expected_answers, list):
-                for item in expected_answers:
-                    if isinstance(item, str):
-                        ordered_meanings.extend(p for p in re.split(r"\s*[|｜]\s*", item) if p.strip())
-            elif isinstance(expected_answers, str):
-                ordered_meanings.extend(p for p in re.split(r"\s*[|｜]\s*", expected_answers) if p.strip())
-            else:
-                ordered_meanings.append(str(expected_answers).strip())
-
-            seen_norm = set()
-            unique_ordered_meanings = []
-            for meaning in ordered_meanings:
-                norm_meaning = self._normalize_text(meaning)
-                if norm_meaning and norm_meaning not in seen_norm:
-                    seen_norm.add(norm_meaning)
-                    unique_ordered_meanings.append(norm_meaning)
-
-            for norm_meaning in unique_ordered_meanings:
-                for i, opt in enumerate(options):
-                    if self._normalize_text(opt) == norm_meaning:
-                        return i
+        idx = self._find_in_bank(question, options)
+        if idx != -1:
+            return idx
 
         # 2. If not found in bank, try AI
         if self.ai_config and self.ai_config.get("enabled"):
@@ -168,3 +316,47 @@ class QuestionProcessor:
         save_error((question, options))
         return -1
 
+    def _ask_ai(self, batch: List[Tuple[str, List[str]]]) -> List[int]:
+        """Answers one batch with a single AI request, retrying unresolved items one by one."""
+        ai_indices = ai_choose_answers_batch(batch, self.ai_config)
+        return [
+            ai_idx if ai_idx != -1 else ai_choose_answer(question, options, self.ai_config)
+            for (question, options), ai_idx in zip(batch, ai_indices)
+        ]
+
+    def get_answer_indices(self, items: List[Tuple[str, List[str]]], batch_size: int = 8,
+                           max_workers: int = 4) -> List[int]:
+        """
+        Finds answers for a whole paper at once.
+
+        Questions missing from the local bank are sent to the AI in batches of
+        batch_size per request instead of one request each, with up to
+        max_workers batches in flight concurrently. Anything a batch reply
+        leaves unresolved is retried with a single-question AI call.
+
+        Args:
+            items: A list of (question, options) pairs.
+            batch_size: Maximum number of questions per AI request.
+            max_workers: Maximum number of concurrent AI requests.
+
+        Returns:
+            A list aligned with items: index (0-3) of the correct answer, or -1 if not found.
+        """
+        results = [self._find_in_bank(question, options) for question, options in items]
+        pending = [i for i, idx in enumerate(results) if idx == -1]
+
+        if pending and self.ai_config and self.ai_config.get("enabled"):
+            chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                answered = executor.map(self._ask_ai, [[items[i] for i in chunk] for chunk in chunks])
+                for chunk, ai_indices in zip(chunks, answered):
+                    for i, ai_idx in zip(chunk, ai_indices):
+                        if ai_idx != -1:
+                            question, options = items[i]
+                            self._persist_answer(question, options[ai_idx])
+                            results[i] = ai_idx
+
+        for i in pending:
+            if results[i] == -1:
+                save_error(items[i])
+        return results
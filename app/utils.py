@@ -1,27 +1,59 @@
 # -*- coding: utf-8 -*-
 """Utility helpers for the project."""
 from __future__ import annotations
-import secrets
-from typing import List, Tuple
+import atexit
+import os
+import threading
+from typing import List, Optional, TextIO, Tuple
+
+# error.txt is opened once on first use and kept open; writes are buffered
+# and flushed every _ERROR_FLUSH_EVERY entries, on close_error_log() and at exit.
+_ERROR_FLUSH_EVERY = 10
+_err_fh: Optional[TextIO] = None
+_err_pending = 0
+_err_lock = threading.Lock()
 
 
 def save_error(question_options: Tuple[str, List[str]]) -> None:
     """Append unrecognized question and options to error.txt."""
+    global _err_fh, _err_pending
     question, options = question_options
     error_message = f"{question}\n{options}\n"
-    with open("error.txt", "a", encoding='utf-8') as f:
-        f.write(error_message)
+    with _err_lock:
+        if _err_fh is None:
+            _err_fh = open("error.txt", "a", encoding='utf-8', buffering=8192)
+        _err_fh.write(error_message)
+        _err_pending += 1
+        if _err_pending >= _ERROR_FLUSH_EVERY:
+            _err_fh.flush()
+            _err_pending = 0
+
+
+def close_error_log() -> None:
+    """Flush and close error.txt if it was opened; the next save_error reopens it."""
+    global _err_fh, _err_pending
+    with _err_lock:
+        if _err_fh is not None:
+            _err_fh.close()
+            _err_fh = None
+            _err_pending = 0
+
+
+atexit.register(close_error_log)
+
+
+# Byte -> charset lookup table for generate_skl_ticket (same mapping as charset[b & 63]).
+_SKL_CHARSET = b"useandom-26T198340PX75pxJACKVERYMINDBUSHWOLF_GQZbfghjklqvwyzrict"
+_SKL_TABLE = bytes(_SKL_CHARSET[b & 63] for b in range(256))
+_SKL_TICKET_LENGTH = 21
 
 
 def generate_skl_ticket() -> str:
     """Generate a random skl-ticket for API requests.
     
     Based on Go implementation: generates a 21-character random string
-    using a specific character set.
+    using a specific character set. Every call returns a fresh ticket,
+    since the server treats it as a per-request nonce.
     """
-    charset = "useandom-26T198340PX75pxJACKVERYMINDBUSHWOLF_GQZbfghjklqvwyzrict"
-    length = 21
     # Generate random bytes and map to charset
-    random_bytes = secrets.token_bytes(length)
-    ticket = ''.join(charset[b & 63] for b in random_bytes)
-    return ticket
+    return os.urandom(_SKL_TICKET_LENGTH).translate(_SKL_TABLE).decode('ascii')
@@ -3,21 +3,42 @@
 
 使用方式：
     python main.py
+    python main.py --parallel   # 以 API 模式并行处理 config.yaml 中的全部账号
 
 说明：
 - 实际业务逻辑位于模块 hdu_bot.HDU 中。
 - 日志初始化在 logging_config.init_logger_from_config 中完成，写入 run.log。
 """
 from __future__ import annotations
+import argparse
+
 from app.logging_config import init_logger_from_config
-from app.hdu_bot import HDU
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="杭电我爱记单词自动答题")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="以 API 模式并行处理 config.yaml 中的全部账号",
+    )
+    args = parser.parse_args()
+
     # 初始化日志（文件 + 控制台）
     init_logger_from_config()
 
-    # 启动自动化流程
+    if args.parallel:
+        # 多账号并行：每个账号独立的 HTTP 会话，共享同一题库
+        from app.config_loader import load_all_user_credentials, load_ai_config
+        from app.hdu_api_client import api_mode_answer_parallel
+        from app.question_processor import QuestionProcessor
+
+        api_mode_answer_parallel(load_all_user_credentials(), QuestionProcessor(load_ai_config()))
+        return
+
+    # 启动自动化流程（延迟导入：Selenium 等依赖在日志初始化之后、且仅浏览器模式才加载）
+    from app.hdu_bot import HDU
+
     hdu = HDU()
     hdu.start()
 